@@ -17,20 +17,88 @@ class Settings(BaseSettings):
         host: Server host address
         port: Server port number
         reload: Enable auto-reload for development
+        workers: Number of worker processes; more than 1 enables production mode
         cors_origins: Comma-separated list of allowed CORS origins
+        upstream_timeout: Maximum timeout in seconds for Vedic Scriptures API calls
+        upstream_timeout_min: Lower bound for the adaptive upstream timeout
+        upstream_timeout_multiplier: Adaptive timeout as a multiple of observed p99 latency
+        upstream_hedging_enabled: Send a duplicate GET when the first exceeds p95 latency
+        upstream_hedge_min_delay: Minimum delay in seconds before sending a hedge
+        upstream_hedge_default_delay: Hedge delay used until enough latency samples exist
+        upstream_hedge_budget: Maximum fraction of upstream requests that may be hedged
+        upstream_hedge_max_in_flight: No hedging while this many requests to a host are in flight
+        breaker_failure_threshold: Consecutive upstream failures that open the circuit
+        breaker_reset_timeout: Seconds an open circuit fails fast before probing again
+        upstream_max_retries: Retries for failed upstream calls (network errors and 5xx); off by default
+        upstream_retry_backoff: Base delay in seconds between upstream retries
+        health_check_interval: Seconds an upstream reachability probe result is reused
+        tts_max_workers: Size of the TTS synthesis worker pool
+        cache_dir: Directory for the shared corpus file and audio cache
+        cache_ttl: Seconds upstream data stays fresh in memory; older corpus files are rebuilt at startup
+        cache_max_entries: Maximum upstream responses kept in each worker's memory
+        warmup_enabled: Preload hot data on startup and report not-ready until done
+        warmup_top_n: Number of most-requested verses to preload
+        warmup_concurrency: Maximum concurrent warm-up fetches/syntheses
+        warmup_tts: Also pre-synthesize audio for preloaded verses
+        warmup_timeout: Seconds after which the instance is marked ready regardless
+        slow_request_threshold_ms: Requests slower than this are logged with a phase breakdown
+        profile_sample_rate: Fraction of requests (0.0-1.0) to profile automatically
+        profile_header: Request header that enables profiling for a single request
+        profile_token: Value the profile header must carry; empty disables header-triggered profiling
+        profile_max_files: Number of most recent profiles kept in ``profile_dir``
+        profile_interval_ms: Stack sampling interval for profiled requests
+        profile_dir: Directory where folded-stack profiles are written
     """
     
     # Vedic Scriptures API
     vedic_api_base_url: str = "https://vedicscriptures.github.io"
+    upstream_timeout: float = 30.0
+    upstream_timeout_min: float = 2.0
+    upstream_timeout_multiplier: float = 4.0
+    upstream_hedging_enabled: bool = True
+    upstream_hedge_min_delay: float = 0.05
+    upstream_hedge_default_delay: float = 1.0
+    upstream_hedge_budget: float = 0.05
+    upstream_hedge_max_in_flight: int = 16
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    upstream_max_retries: int = 0
+    upstream_retry_backoff: float = 0.2
     
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = True
+    workers: int = 1
     
     # CORS Configuration
     cors_origins: str = "*"  # Allow all origins in development
     
+    # Health & TTS Configuration
+    health_check_interval: float = 10.0
+    tts_max_workers: int = 4
+    
+    # Cache Configuration
+    cache_dir: str = ".cache"
+    cache_ttl: float = 86400.0
+    cache_max_entries: int = 1024
+    
+    # Warm-up Configuration
+    warmup_enabled: bool = True
+    warmup_top_n: int = 20
+    warmup_concurrency: int = 8
+    warmup_tts: bool = True
+    warmup_timeout: float = 120.0
+    
+    # Tracing & Profiling Configuration
+    slow_request_threshold_ms: float = 2000.0
+    profile_sample_rate: float = 0.0
+    profile_header: str = "X-Profile"
+    profile_token: str = ""
+    profile_max_files: int = 50
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "profiles"
+    
     class Config:
         """Pydantic configuration."""
         env_file = ".env"
@@ -9,11 +9,35 @@ This is the main FastAPI application that serves:
 For API documentation, visit /docs when the server is running.
 """
 
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config import settings
-from .routers import verses, tts
+from .metrics import metrics_middleware, registry, render_metrics
+from .profiling import profiling_middleware
+from .routers import verses, tts, phonetics
+from .services.cache import corpus_store
+from .services.phonetic_index import phonetic_index_service
+from .services.resilience import upstream_resilience
+from .services.tts_service import tts_service
+from .services.vedic_service import vedic_service
+from .services.warmup import verse_popularity, warmup_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm caches in the background on startup; persist verse popularity on shutdown."""
+    warmup_service.start()
+    yield
+    await warmup_service.stop()
+    await phonetic_index_service.stop()
+    verse_popularity.save()
+    await vedic_service.aclose()
+
 
 # Create FastAPI application instance
 app = FastAPI(
@@ -33,7 +57,8 @@ app = FastAPI(
     },
     license_info={
         "name": "MIT",
-    }
+    },
+    lifespan=lifespan
 )
 
 # Configure CORS middleware
@@ -48,9 +73,19 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Trace request phases, sample-profile opted-in requests and log slow ones
+app.middleware("http")(profiling_middleware)
+
+# Record per-route latency, in-flight requests and status codes
+app.middleware("http")(metrics_middleware)
+if settings.workers > 1:
+    # Each worker only reports its own metrics; keep their series apart
+    registry.const_labels["worker"] = str(os.getpid())
+
 # Include API routers
 app.include_router(verses.router)
 app.include_router(tts.router)
+app.include_router(phonetics.router)
 
 
 @app.get("/", tags=["health"])
@@ -72,42 +107,101 @@ async def root() -> dict:
         "endpoints": {
             "verses": "/api/v1/verses",
             "tts": "/api/v1/tts",
-            "health": "/health"
+            "phonetics": "/api/v1/phonetics",
+            "health": "/health",
+            "metrics": "/metrics"
         }
     }
 
 
 @app.get("/health", tags=["health"])
-async def health_check() -> dict:
+async def health_check() -> JSONResponse:
     """
-    Health check endpoint for monitoring.
+    Health check endpoint for monitoring and load balancer readiness.
+    
+    The service is ready once startup warm-up has finished. An unreachable
+    upstream Vedic Scriptures API (or open circuit), a saturated TTS pool or
+    a cold phonetic index is reported as degraded but stays ready, since
+    cached and corpus data can still be served; otherwise an upstream
+    outage would drain every instance at once. Returns 503 when not ready.
     
     Returns:
-        dict: Service health status.
+        JSONResponse: Service readiness and per-dependency checks.
     """
-    return {
-        "status": "healthy",
-        "service": "recitation-companion-api",
-        "version": "1.0.0"
-    }
-
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.reload
+    upstream_reachable = await vedic_service.check_upstream()
+    warm = warmup_service.is_ready
+    pool = tts_service.pool_status()
+    pool_saturated = tts_service.is_saturated
+    cache_warm = phonetic_index_service.is_ready
+    ready = warm
+    
+    if not warm:
+        status = "warming_up"
+    elif not upstream_reachable or pool_saturated or not cache_warm:
+        status = "degraded"
+    else:
+        status = "healthy"
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": status,
+            "ready": ready,
+            "service": "recitation-companion-api",
+            "version": "1.0.0",
+            "checks": {
+                "warmup": warmup_service.status(),
+                "upstream": {
+                    "reachable": upstream_reachable,
+                    "base_url": settings.vedic_api_base_url,
+                    "circuit": upstream_resilience.breaker(vedic_service.host).state,
+                    "timeout_seconds": upstream_resilience.latency(vedic_service.host).timeout()
+                },
+                "cache": {
+                    "phonetic_index_warm": cache_warm,
+                    "corpus_file_loaded": corpus_store.is_loaded,
+                    "corpus_file_age_seconds": None if corpus_store.age is None else round(corpus_store.age),
+                    "corpus_records": len(corpus_store),
+                    "memory_entries": vedic_service.memory_cache_size
+                },
+                "tts_pool": {**pool, "saturated": pool_saturated}
+            }
+        }
     )
 
 
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics endpoint.
+    
+    Returns:
+        Response: Metrics in the Prometheus text exposition format.
+    """
+    return render_metrics()
+
 
 if __name__ == "__main__":
+    import logging
     import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.reload
-    )
+    
+    if settings.workers > 1:
+        # Production mode: build the shared corpus file once in this process,
+        # then start workers that memory-map it instead of warming up separately
+        from .services.cache import prepare_shared_cache
+        
+        logging.basicConfig(level=logging.INFO)
+        prepare_shared_cache()
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            workers=settings.workers
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=settings.reload
+        )
@@ -0,0 +1,351 @@
+"""
+Prometheus-style metrics.
+
+A small, dependency-free implementation of counters, gauges and histograms
+rendered in the Prometheus text exposition format (version 0.0.4) on
+``/metrics``. Metrics are per process; metric updates are thread-safe so they
+can be recorded from the TTS worker pool as well as the event loop.
+
+With several workers, a scrape is answered by whichever worker accepts the
+connection and only shows that worker's counters. In that mode every
+sample carries a constant ``worker`` label (the process id, see
+``MetricsRegistry.const_labels``) so series from different workers are not
+mixed up; aggregate with ``sum without (worker)`` and keep in mind that one
+scrape covers a single worker.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from fastapi import Request, Response
+from starlette.routing import Match
+
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow upstream calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self, const_labels: str = "") -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for suffix, labels, value in self._samples():
+            if const_labels:
+                labels = "{" + const_labels + ("," + labels[1:] if labels else "}")
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[idx] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        samples = []
+        names = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0.0
+            for idx, bound in enumerate(self.buckets):
+                cumulative += state[idx]
+                samples.append(("_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative))
+            samples.append(("_sum", _format_labels(self.labelnames, key), state[-2]))
+            samples.append(("_count", _format_labels(self.labelnames, key), state[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        # Labels added to every sample, e.g. the worker process id
+        self.const_labels: Dict[str, str] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        const_labels = _format_labels(self.const_labels, self.const_labels.values())[1:-1]
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(const_labels))
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# HTTP server metrics
+http_requests_total = registry.counter(
+    "http_requests_total", "Total HTTP requests by route and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+    ("method", "route"),
+)
+
+# Upstream Vedic Scriptures API metrics
+upstream_request_duration_seconds = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream API call latency by endpoint.",
+    ("endpoint",),
+)
+upstream_errors_total = registry.counter(
+    "upstream_errors_total", "Failed upstream API calls by endpoint and reason.",
+    ("endpoint", "reason"),
+)
+upstream_retries_total = registry.counter(
+    "upstream_retries_total", "Retried upstream API calls by endpoint.",
+    ("endpoint",),
+)
+
+# Upstream resilience metrics
+upstream_circuit_state = registry.gauge(
+    "upstream_circuit_state", "Circuit breaker state per host (0=closed, 1=half-open, 2=open).",
+    ("host",),
+)
+upstream_circuit_rejections_total = registry.counter(
+    "upstream_circuit_rejections_total", "Upstream calls rejected by an open circuit breaker.",
+    ("host",),
+)
+upstream_timeout_seconds = registry.gauge(
+    "upstream_timeout_seconds", "Current adaptive upstream timeout per host.",
+    ("host",),
+)
+upstream_hedges_total = registry.counter(
+    "upstream_hedges_total", "Hedged duplicate upstream requests sent.",
+    ("host",),
+)
+upstream_hedge_wins_total = registry.counter(
+    "upstream_hedge_wins_total", "Hedged requests that answered before the original.",
+    ("host",),
+)
+upstream_hedges_suppressed_total = registry.counter(
+    "upstream_hedges_suppressed_total", "Hedges not sent, by reason (budget, in_flight).",
+    ("host", "reason"),
+)
+upstream_hedge_win_ratio = registry.gauge(
+    "upstream_hedge_win_ratio", "Fraction of hedged requests that won.",
+    ("host",),
+)
+upstream_fallbacks_total = registry.counter(
+    "upstream_fallbacks_total", "Responses served from stale cache because upstream failed.",
+    ("endpoint",),
+)
+
+# Cache metrics
+cache_lookups_total = registry.counter(
+    "cache_lookups_total", "Cache lookups by tier (memory, corpus, audio) and result.",
+    ("tier", "result"),
+)
+
+# Text-to-speech metrics
+tts_queue_wait_seconds = registry.histogram(
+    "tts_queue_wait_seconds", "Time TTS jobs wait for a synthesis worker.",
+)
+tts_synthesis_seconds = registry.histogram(
+    "tts_synthesis_seconds", "Time spent synthesizing speech.",
+)
+tts_bytes_total = registry.counter(
+    "tts_bytes_total", "Audio bytes produced by TTS synthesis.",
+)
+tts_requests_total = registry.counter(
+    "tts_requests_total", "TTS synthesis jobs by outcome.",
+    ("outcome",),
+)
+tts_workers_busy = registry.gauge(
+    "tts_workers_busy", "TTS workers currently synthesizing.",
+)
+tts_jobs_queued = registry.gauge(
+    "tts_jobs_queued", "TTS jobs waiting for a worker.",
+)
+
+
+def _route_template(request: Request) -> str:
+    """
+    Resolve the route path template (e.g. ``/api/v1/slok/{chapter}/{verse}``)
+    so that metrics are labelled per route rather than per concrete URL.
+    """
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next) -> Response:
+    """Record per-route latency, in-flight requests and status codes."""
+    method = request.method
+    route = _route_template(request)
+    http_requests_in_flight.inc(method=method, route=route)
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        http_request_duration_seconds.observe(time.perf_counter() - start, method=method, route=route)
+        http_requests_total.inc(method=method, route=route, status=status)
+        http_requests_in_flight.dec(method=method, route=route)
+
+
+def render_metrics() -> Response:
+    """Render the registry in the Prometheus text format."""
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
@@ -87,3 +87,66 @@ class ErrorResponse(BaseModel):
                 "status_code": 404
             }
         }
+
+
+class VerseRef(BaseModel):
+    """Reference to a single verse."""
+    chapter: int
+    verse: int
+
+
+class AksharaSearchResult(BaseModel):
+    """Verses containing a given akshara or consonant cluster."""
+    query: str
+    count: int
+    verses: List[VerseRef] = []
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "क्ष",
+                "count": 2,
+                "verses": [{"chapter": 1, "verse": 1}, {"chapter": 13, "verse": 1}]
+            }
+        }
+
+
+class WordAnalysis(BaseModel):
+    """Phonetic breakdown of a single word."""
+    text: str
+    aksharas: List[str]
+    features: List[str] = []
+    difficulty: int
+
+
+class VerseAnalysis(BaseModel):
+    """Per-word phonetic analysis of a verse."""
+    chapter: int
+    verse: int
+    difficulty: int
+    words: List[WordAnalysis] = []
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "chapter": 2,
+                "verse": 47,
+                "difficulty": 17,
+                "words": [
+                    {
+                        "text": "कर्मण्येवाधिकारस्ते",
+                        "aksharas": ["क", "र्म", "ण्ये", "वा", "धि", "का", "र", "स्ते"],
+                        "features": ["conjunct", "retroflex", "aspirate", "sibilant"],
+                        "difficulty": 13
+                    }
+                ]
+            }
+        }
+
+
+class VerseDifficulty(BaseModel):
+    """Difficulty score of a verse with its hardest words."""
+    chapter: int
+    verse: int
+    difficulty: int
+    problematic_words: List[str] = []
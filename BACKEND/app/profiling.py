@@ -0,0 +1,264 @@
+"""
+Request tracing and opt-in sampling profiler.
+
+Every request gets a lightweight trace that aggregates span timings for its
+phases (upstream fetch, transform, model validation, serialization). The
+breakdown is returned in a ``Server-Timing`` header and logged when the
+request exceeds ``settings.slow_request_threshold_ms``.
+
+Profiling is opt-in, either per request via the ``settings.profile_header``
+header (which must carry ``settings.profile_token``) or globally at
+``settings.profile_sample_rate``. A profiled request samples the event loop
+thread's stack and writes it in the folded-stack format understood by
+flamegraph.pl, speedscope and inferno. Because the event loop is shared,
+samples include any concurrently running requests. At most one request is
+profiled at a time and only the newest ``settings.profile_max_files``
+profiles are kept.
+"""
+
+import functools
+import hmac
+import inspect
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Span names in the order they are reported
+PHASES = ("upstream_fetch", "transform", "model_validation", "endpoint", "serialization")
+
+
+class RequestTrace:
+    """
+    Aggregated span timings for one request.
+
+    Concurrent child tasks (e.g. the ``asyncio.gather`` fan-out in
+    ``get_chapter_with_verses``) share their parent's trace, so span totals
+    can exceed the request's wall-clock time; ``count`` shows the fan-out.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def total(self, name: str) -> float:
+        entry = self.spans.get(name)
+        return entry[0] if entry else 0.0
+
+    def breakdown(self) -> List[Tuple[str, float, int]]:
+        """Span (name, milliseconds, count) tuples, known phases first."""
+        names = [name for name in PHASES if name in self.spans]
+        names += sorted(name for name in self.spans if name not in PHASES)
+        return [(name, self.spans[name][0] * 1000, int(self.spans[name][1])) for name in names]
+
+    def server_timing(self, total_ms: float) -> str:
+        """Render the breakdown as a ``Server-Timing`` header value."""
+        parts = [
+            f'{name};dur={ms:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+            for name, ms, count in self.breakdown()
+        ]
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block and add it to the current request's trace (no-op outside a request)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+class StackSampler:
+    """
+    Periodically samples one thread's Python stack into folded-stack counts.
+
+    Each line of ``folded()`` is ``frame;frame;...;leaf count``, root first.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+# Only one sampler runs at a time; profiles overlap anyway on the shared loop
+_profile_slot = threading.Lock()
+
+
+def _token_matches(header: str) -> bool:
+    """Constant-time token check; header values are latin-1 decoded by Starlette."""
+    try:
+        return hmac.compare_digest(header.encode("latin-1"), settings.profile_token.encode("utf-8"))
+    except UnicodeEncodeError:
+        return False
+
+
+def _should_profile(request: Request) -> bool:
+    header = request.headers.get(settings.profile_header)
+    if header and settings.profile_token and _token_matches(header):
+        return True
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+
+def _prune_profiles(directory: Path) -> None:
+    """Delete the oldest profiles beyond ``settings.profile_max_files``."""
+    profiles = sorted(directory.glob("*.folded"), key=lambda path: path.name, reverse=True)
+    for path in profiles[max(settings.profile_max_files, 0):]:
+        path.unlink(missing_ok=True)
+
+
+def _write_profile(request: Request, sampler: StackSampler) -> Optional[str]:
+    """Write a folded-stack profile to ``settings.profile_dir`` and return its file name."""
+    if not sampler.samples:
+        return None
+    slug = request.url.path.strip("/").replace("/", "_") or "root"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{request.method}-{slug}.folded"
+    directory = Path(settings.profile_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(sampler.folded(), encoding="utf-8")
+    _prune_profiles(directory)
+    return name
+
+
+async def profiling_middleware(request: Request, call_next) -> Response:
+    """Trace request phases, optionally profile, and log slow requests."""
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    sampler = None
+    if _should_profile(request) and _profile_slot.acquire(blocking=False):
+        sampler = StackSampler(threading.get_ident(), settings.profile_interval_ms / 1000).start()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_trace.reset(token)
+        if sampler is not None:
+            sampler.stop()
+            _profile_slot.release()
+
+    total_ms = (time.perf_counter() - trace.started_at) * 1000
+    response.headers["Server-Timing"] = trace.server_timing(total_ms)
+
+    if sampler is not None:
+        profile_name = _write_profile(request, sampler)
+        if profile_name:
+            response.headers["X-Profile-Id"] = profile_name
+            logger.info(f"Profile written: {profile_name} ({sum(sampler.samples.values())} samples)")
+
+    if total_ms >= settings.slow_request_threshold_ms:
+        phases = ", ".join(f"{name}={ms:.1f}ms/{count}" for name, ms, count in trace.breakdown())
+        logger.warning(
+            f"Slow request: {request.method} {request.url.path}"
+            f"{'?' + request.url.query if request.url.query else ''} "
+            f"took {total_ms:.1f}ms [{phases or 'no spans'}]"
+        )
+    return response
+
+
+def _traced_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an async endpoint so its execution time is recorded as the ``endpoint`` span."""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        with span("endpoint"):
+            return await endpoint(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """
+    Route class that splits handler time into endpoint and serialization.
+
+    Everything the route handler does outside the endpoint function itself
+    (response model validation and JSON rendering) is recorded as
+    ``serialization``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # include_router() re-creates routes from ``route.endpoint``, which is
+        # already wrapped; wrapping again would count the endpoint span twice
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "__traced__", False):
+            endpoint = _traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request: Request) -> Response:
+            trace = _current_trace.get()
+            if trace is None:
+                return await handler(request)
+            start = time.perf_counter()
+            endpoint_before = trace.total("endpoint")
+            response = await handler(request)
+            elapsed = time.perf_counter() - start
+            endpoint_time = trace.total("endpoint") - endpoint_before
+            trace.add("serialization", max(elapsed - endpoint_time, 0.0))
+            return response
+
+        return traced_handler
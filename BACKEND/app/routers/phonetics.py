@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Path, Query
+from typing import List, Optional
+
+from ..models.schemas import AksharaSearchResult, VerseAnalysis, VerseDifficulty, VerseRef
+from ..profiling import TracedRoute
+from ..services.phonetic_index import phonetic_index_service
+
+router = APIRouter(prefix="/api/v1/phonetics", tags=["phonetics"], route_class=TracedRoute)
+
+
+@router.get("/search", response_model=AksharaSearchResult, summary="Find verses containing an akshara")
+async def search_akshara(
+    q: str = Query(..., min_length=1, max_length=16, description="Akshara or consonant cluster, e.g. क्ष")
+) -> AksharaSearchResult:
+    """
+    Find all verses containing an akshara or consonant cluster.
+
+    - **q**: A bare cluster such as `क्ष` matches every akshara built on it
+      (`क्षे`, `क्ष्मी`); a full akshara such as `क्षे` must match exactly.
+    """
+    try:
+        index = await phonetic_index_service.get_index()
+        refs = index.verses_containing(q)
+        return AksharaSearchResult(
+            query=q.strip(),
+            count=len(refs),
+            verses=[VerseRef(chapter=chapter, verse=verse) for chapter, verse in refs]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/slok/{chapter}/{verse}", response_model=VerseAnalysis, summary="Get phonetic analysis of a verse")
+async def get_verse_analysis(
+    chapter: int = Path(..., ge=1, le=18, description="Chapter number (1-18)"),
+    verse: int = Path(..., ge=1, description="Verse number")
+) -> VerseAnalysis:
+    """
+    Get the per-word phonetic breakdown of a verse.
+
+    - **chapter**: Chapter number (1-18)
+    - **verse**: Verse number within the chapter
+
+    Returns each word split into aksharas with its phonetic features
+    (conjunct, retroflex, aspirate, visarga, anusvara, sibilant, halant)
+    and a weighted difficulty score.
+    """
+    try:
+        index = await phonetic_index_service.get_index()
+        words = index.verse_words(chapter, verse)
+        if words is None:
+            raise HTTPException(status_code=404, detail="Verse not found")
+        return VerseAnalysis(
+            chapter=chapter,
+            verse=verse,
+            difficulty=index.verse_difficulty(chapter, verse),
+            words=words
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/difficult-verses", response_model=List[VerseDifficulty], summary="Get most difficult verses")
+async def get_difficult_verses(
+    limit: int = Query(10, ge=1, le=100, description="Number of verses to return"),
+    chapter: Optional[int] = Query(None, ge=1, le=18, description="Restrict to one chapter")
+) -> List[VerseDifficulty]:
+    """
+    Get the verses with the highest pronunciation difficulty.
+
+    - **limit**: Number of verses to return (1-100)
+    - **chapter**: Optional chapter filter (1-18)
+
+    Each verse lists its three hardest words as problematic words.
+    """
+    try:
+        index = await phonetic_index_service.get_index()
+        results = []
+        for ch, v, score in index.most_difficult_verses(limit, chapter):
+            words = sorted(index.verse_words(ch, v), key=lambda word: word["difficulty"], reverse=True)
+            results.append(VerseDifficulty(
+                chapter=ch,
+                verse=v,
+                difficulty=score,
+                problematic_words=[word["text"] for word in words[:3] if word["difficulty"] > 0]
+            ))
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
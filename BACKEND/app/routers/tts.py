@@ -7,12 +7,13 @@ with Hindi language and Indian accent for authentic pronunciation.
 
 from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
-from gtts import gTTS
-from io import BytesIO
 import logging
 
+from ..profiling import TracedRoute
+from ..services.tts_service import tts_service
+
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/v1/tts", tags=["Text-to-Speech"])
+router = APIRouter(prefix="/api/v1/tts", tags=["Text-to-Speech"], route_class=TracedRoute)
 
 
 class TTSRequest(BaseModel):
@@ -32,13 +33,8 @@ async def generate_speech(request: TTSRequest) -> Response:
     try:
         logger.info(f"TTS request: {request.text[:50]}...")
         
-        # Generate speech using Google TTS (Hindi with Indian accent)
-        tts = gTTS(text=request.text, lang='hi', slow=False, tld='co.in')
-        
-        buffer = BytesIO()
-        tts.write_to_fp(buffer)
-        buffer.seek(0)
-        audio_bytes = buffer.getvalue()
+        # Synthesize on the TTS worker pool (Hindi with Indian accent)
+        audio_bytes = await tts_service.synthesize(request.text)
         
         logger.info(f"Generated {len(audio_bytes):,} bytes")
         
@@ -69,6 +65,7 @@ async def health_check() -> dict:
         "service": "Google Text-to-Speech",
         "language": "Hindi (hi)",
         "accent": "Indian (co.in)",
-        "format": "MP3"
+        "format": "MP3",
+        "pool": tts_service.pool_status()
     }
 
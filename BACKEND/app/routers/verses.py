@@ -2,9 +2,11 @@ from fastapi import APIRouter, HTTPException, Path
 from typing import List
 
 from ..models.schemas import Verse, ChapterSummary, ChapterDetail
+from ..profiling import TracedRoute, span
 from ..services.vedic_service import vedic_service
+from ..services.warmup import verse_popularity
 
-router = APIRouter(prefix="/api/v1", tags=["verses"])
+router = APIRouter(prefix="/api/v1", tags=["verses"], route_class=TracedRoute)
 
 
 @router.get("/slok/{chapter}/{verse}", response_model=Verse, summary="Get specific verse")
@@ -23,7 +25,9 @@ async def get_verse(
     """
     try:
         verse_data = await vedic_service.get_verse(chapter, verse)
-        return Verse(**verse_data)
+        verse_popularity.record(chapter, verse)
+        with span("model_validation"):
+            return Verse(**verse_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -43,7 +47,8 @@ async def get_random_verse(
     """
     try:
         verse_data = await vedic_service.get_random_verse_from_chapter(chapter)
-        return Verse(**verse_data)
+        with span("model_validation"):
+            return Verse(**verse_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -60,7 +65,8 @@ async def get_all_chapters() -> List[ChapterSummary]:
     """
     try:
         chapters_data = await vedic_service.get_all_chapters()
-        return [ChapterSummary(**chapter) for chapter in chapters_data]
+        with span("model_validation"):
+            return [ChapterSummary(**chapter) for chapter in chapters_data]
     except HTTPException:
         raise
     except Exception as e:
@@ -87,7 +93,8 @@ async def get_chapter(
             chapter_data = await vedic_service.get_chapter(chapter)
             chapter_data["verses"] = []
         
-        return ChapterDetail(**chapter_data)
+        with span("model_validation"):
+            return ChapterDetail(**chapter_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -104,7 +111,8 @@ async def get_verse_of_the_day() -> Verse:
     """
     try:
         verse_data = await vedic_service.get_verse_of_the_day()
-        return Verse(**verse_data)
+        with span("model_validation"):
+            return Verse(**verse_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,337 @@
+"""
+Cache tiers for upstream data and synthesized audio.
+
+- ``MemoryCache``: small per-process LRU with TTL for upstream JSON.
+- ``CorpusStore``: read-only, memory-mapped file holding the raw upstream JSON
+  for every chapter and verse. It is written by a warm-up process
+  (``python -m app.services.cache``) and mapped by every worker, so the
+  corpus lives once in the OS page cache regardless of the worker count.
+  Workers pick up a rebuilt file without restarting.
+- ``AudioStore``: directory of synthesized MP3 files keyed by text hash,
+  shared by all workers on the same host.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from ..metrics import cache_lookups_total
+
+logger = logging.getLogger(__name__)
+
+# Corpus file layout: MAGIC | u64 index length | index JSON | record bytes...
+# The index maps endpoint -> [offset, length] relative to the record section.
+CORPUS_MAGIC = b"RCCORP01"
+_HEADER = struct.Struct("<8sQ")
+
+
+class MemoryCache:
+    """Per-process LRU cache with a fixed TTL; expired entries linger until evicted."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh value; expired entries are kept for ``get_stale``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return a value even if it has expired, for use when upstream is failing."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CorpusStore:
+    """
+    Read-only view of the memory-mapped corpus file.
+
+    Only the small endpoint index is parsed per process; records are decoded
+    from the shared mapping on demand. The file is re-checked at most every
+    ``reopen_interval`` seconds and remapped when it has been replaced (or
+    created).
+
+    Records do not expire: the scripture corpus is static, and expiring it
+    would send every worker back to upstream. The file is rebuilt at
+    startup when older than ``settings.cache_ttl`` (``prepare_shared_cache``)
+    or on demand with ``python -m app.services.cache``.
+    """
+
+    reopen_interval = 30.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._data_offset = 0
+        self._version: Optional[Tuple[int, int]] = None
+        self._written_at = 0.0
+        self._checked_at = float("-inf")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._mmap is not None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the mapped corpus file was written, or None if none is mapped."""
+        return time.time() - self._written_at if self._mmap is not None else None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _open(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            with open(self.path, "rb") as fh:
+                stat = os.fstat(fh.fileno())
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return
+        try:
+            magic, index_len = _HEADER.unpack_from(mapped, 0)
+        except struct.error:
+            magic = None
+        if magic != CORPUS_MAGIC:
+            mapped.close()
+            logger.warning(f"Ignoring corpus file with unknown format: {self.path}")
+            return
+        index_start = _HEADER.size
+        index = {
+            endpoint: (offset, length)
+            for endpoint, (offset, length) in json.loads(mapped[index_start:index_start + index_len]).items()
+        }
+        self.close()
+        self._index = index
+        self._data_offset = index_start + index_len
+        self._mmap = mapped
+        self._version = (stat.st_mtime_ns, stat.st_ino)
+        self._written_at = stat.st_mtime
+        logger.info(f"Mapped corpus file {self.path} ({len(self._index)} records)")
+
+    def _refresh(self) -> None:
+        """Remap the file if it was created or replaced since the last check."""
+        if time.monotonic() - self._checked_at < self.reopen_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Keep serving the current mapping; the open file stays valid
+            return
+        if self._mmap is None or (stat.st_mtime_ns, stat.st_ino) != self._version:
+            self._open()
+
+    def _lookup(self, endpoint: str) -> Optional[Any]:
+        location = self._index.get(endpoint) if self._mmap is not None else None
+        if location is None:
+            return None
+        offset, length = location
+        start = self._data_offset + offset
+        return json.loads(self._mmap[start:start + length])
+
+    def get(self, endpoint: str) -> Optional[Any]:
+        """Return the decoded upstream JSON for an endpoint, or None if not stored."""
+        self._refresh()
+        return self._lookup(endpoint)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._index = {}
+
+    @classmethod
+    def read_all(cls, path: Path) -> Dict[str, Any]:
+        """Decode every record of a corpus file; empty if it is missing or unreadable."""
+        store = cls(path)
+        store._open()
+        try:
+            return {endpoint: store._lookup(endpoint) for endpoint in store._index}
+        finally:
+            store.close()
+
+    @staticmethod
+    def write(path: Path, records: Dict[str, Any]) -> None:
+        """Atomically write a corpus file from endpoint -> JSON-serializable records."""
+        index = {}
+        chunks = []
+        offset = 0
+        for endpoint, record in records.items():
+            payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index[endpoint] = [offset, len(payload)]
+            chunks.append(payload)
+            offset += len(payload)
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(_HEADER.pack(CORPUS_MAGIC, len(index_bytes)))
+                fh.write(index_bytes)
+                for chunk in chunks:
+                    fh.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class AudioStore:
+    """Synthesized audio on disk, keyed by a hash of the input text."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, text: str) -> Path:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.mp3"
+
+    def get(self, text: str) -> Optional[bytes]:
+        try:
+            audio = self._path(text).read_bytes()
+        except FileNotFoundError:
+            cache_lookups_total.inc(tier="audio", result="miss")
+            return None
+        cache_lookups_total.inc(tier="audio", result="hit")
+        return audio
+
+    def contains(self, text: str) -> bool:
+        return self._path(text).exists()
+
+    def put(self, text: str, audio: bytes) -> None:
+        """Write audio atomically so concurrent workers never read a partial file."""
+        path = self._path(text)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+CACHE_DIR = Path(settings.cache_dir)
+CORPUS_PATH = CACHE_DIR / "corpus.bin"
+
+corpus_store = CorpusStore(CORPUS_PATH)
+audio_store = AudioStore(CACHE_DIR / "audio")
+
+
+async def build_corpus_file(path: Path = CORPUS_PATH, concurrency: int = 16) -> int:
+    """
+    Fetch every chapter and verse from upstream and write the corpus file.
+
+    Endpoints that fail to load are skipped (with their verses, for a failed
+    chapter) and kept from the previous corpus file when it has them, so a
+    partial outage never makes the file worse than before. All requests
+    share one HTTP client so connections and TLS setup are reused.
+
+    Returns:
+        Number of records written
+
+    Raises:
+        RuntimeError: If nothing could be fetched and there is no previous file
+    """
+    from fastapi import HTTPException
+
+    from .vedic_service import vedic_service
+
+    semaphore = asyncio.Semaphore(concurrency)
+    records: Dict[str, Any] = {}
+    failed = []
+
+    async with vedic_service.create_client() as client:
+        async def fetch(endpoint: str) -> Optional[Any]:
+            async with semaphore:
+                try:
+                    data = await vedic_service._fetch_upstream(endpoint, client)
+                except HTTPException as e:
+                    failed.append(endpoint)
+                    logger.warning(f"Corpus fetch {endpoint} failed: {e.detail}")
+                    return None
+                records[endpoint] = data
+                return data
+
+        chapters = await asyncio.gather(*(fetch(f"/chapter/{ch}/") for ch in range(1, 19)))
+        await asyncio.gather(*(
+            fetch(f"/slok/{ch}/{verse}/")
+            for ch, chapter in zip(range(1, 19), chapters)
+            if chapter is not None
+            for verse in range(1, chapter.get("verses_count", 0) + 1)
+        ))
+
+    if failed:
+        kept = {
+            endpoint: record
+            for endpoint, record in CorpusStore.read_all(path).items()
+            if endpoint not in records
+        }
+        records.update(kept)
+        logger.warning(
+            f"{len(failed)} corpus fetches failed (missing chapters skip their verses); "
+            f"kept {len(kept)} records from the previous corpus file"
+        )
+    if not records:
+        raise RuntimeError("No corpus records could be fetched from upstream")
+
+    ordered = {endpoint: records[endpoint] for endpoint in sorted(records)}
+    CorpusStore.write(path, ordered)
+    return len(ordered)
+
+
+def prepare_shared_cache(max_age: Optional[float] = None) -> None:
+    """
+    Build the corpus file unless a fresh one already exists.
+
+    Intended to run once in the parent process before workers are started.
+    If the build fails, workers use an existing (stale) file if there is
+    one, or fetch from upstream as in single-worker mode.
+    """
+    max_age = settings.cache_ttl if max_age is None else max_age
+    if CORPUS_PATH.exists() and time.time() - CORPUS_PATH.stat().st_mtime < max_age:
+        logger.info(f"Using existing corpus file {CORPUS_PATH}")
+        return
+    start = time.perf_counter()
+    try:
+        count = asyncio.run(build_corpus_file())
+    except Exception as e:
+        fallback = "serving the existing corpus file" if CORPUS_PATH.exists() else "workers will fetch from upstream"
+        logger.error(f"Could not build corpus file: {e}; {fallback}")
+        return
+    logger.info(f"Wrote {count} records to {CORPUS_PATH} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    prepare_shared_cache(max_age=0)
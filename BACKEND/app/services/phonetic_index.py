@@ -0,0 +1,495 @@
+"""
+Devanagari akshara segmentation and phonetic index.
+
+Every corpus verse is segmented once into words and aksharas (syllabic
+units: consonant clusters joined by virama, plus their vowel sign and
+nasal/visarga modifiers). Each distinct akshara is tagged with phonetic
+feature flags and the whole corpus is packed into flat ``array`` buffers,
+so that lookups such as "all verses containing क्ष" or "difficulty of each
+word in 2.47" are dictionary/slice operations instead of re-parsing text.
+"""
+
+import asyncio
+import heapq
+import logging
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .vedic_service import vedic_service
+
+logger = logging.getLogger(__name__)
+
+
+# Devanagari code points
+VIRAMA = "्"
+NUKTA = "़"
+ANUSVARA = "ं"
+CANDRABINDU = "ँ"
+VISARGA = "ः"
+OM = "ॐ"
+ZWJ = "\u200d"
+ZWNJ = "\u200c"
+
+# Phonetic feature flags (one byte per akshara)
+CONJUNCT = 1 << 0
+RETROFLEX = 1 << 1
+ASPIRATE = 1 << 2
+VISARGA_FLAG = 1 << 3
+ANUSVARA_FLAG = 1 << 4
+SIBILANT = 1 << 5
+HALANT = 1 << 6
+
+FEATURE_NAMES = {
+    CONJUNCT: "conjunct",
+    RETROFLEX: "retroflex",
+    ASPIRATE: "aspirate",
+    VISARGA_FLAG: "visarga",
+    ANUSVARA_FLAG: "anusvara",
+    SIBILANT: "sibilant",
+    HALANT: "halant",
+}
+
+# Relative pronunciation weight of each feature, used for word difficulty
+FEATURE_WEIGHTS = {
+    CONJUNCT: 3,
+    RETROFLEX: 2,
+    ASPIRATE: 1,
+    VISARGA_FLAG: 1,
+    ANUSVARA_FLAG: 1,
+    SIBILANT: 1,
+    HALANT: 1,
+}
+
+RETROFLEX_CHARS = frozenset("टठडढणषळड़ढ़" "ऋॠृॄ")
+ASPIRATE_CHARS = frozenset("खघछझठढथधफभख़ढ़फ़")
+SIBILANT_CHARS = frozenset("शषस")
+
+# Word separators besides whitespace: danda, double danda, pipes, digits
+_SEPARATORS = frozenset("।॥|,;.!?-()[]{}\"'" "०१२३४५६७८९0123456789")
+
+
+def _is_consonant(ch: str) -> bool:
+    code = ord(ch)
+    return 0x0915 <= code <= 0x0939 or 0x0958 <= code <= 0x095F or 0x0978 <= code <= 0x097F
+
+
+def _is_independent_vowel(ch: str) -> bool:
+    code = ord(ch)
+    return 0x0904 <= code <= 0x0914 or 0x0960 <= code <= 0x0961 or 0x0972 <= code <= 0x0977
+
+
+def _is_vowel_sign(ch: str) -> bool:
+    code = ord(ch)
+    return (
+        0x093A <= code <= 0x093B
+        or 0x093E <= code <= 0x094C
+        or 0x094E <= code <= 0x094F
+        or 0x0955 <= code <= 0x0957
+        or 0x0962 <= code <= 0x0963
+    )
+
+
+def _is_modifier(ch: str) -> bool:
+    """Anusvara, candrabindu, visarga and Vedic accent marks."""
+    code = ord(ch)
+    return 0x0900 <= code <= 0x0903 or 0x0951 <= code <= 0x0954 or 0x1CD0 <= code <= 0x1CFF
+
+
+def segment_word(word: str) -> List[str]:
+    """
+    Split a single Devanagari word into aksharas.
+
+    Consonants joined by virama form one conjunct akshara; a trailing
+    virama (e.g. the final ``त्`` of ``तत्``) stays attached to its consonant.
+
+    Args:
+        word: A word without whitespace or danda separators
+
+    Returns:
+        List of akshara strings, in order
+    """
+    aksharas = []
+    n = len(word)
+    i = 0
+    while i < n:
+        ch = word[i]
+        j = i + 1
+        if _is_consonant(ch):
+            while True:
+                if j < n and word[j] == NUKTA:
+                    j += 1
+                if j < n and word[j] == VIRAMA:
+                    j += 1
+                    while j < n and word[j] in (ZWJ, ZWNJ):
+                        j += 1
+                    if j < n and _is_consonant(word[j]):
+                        j += 1
+                        continue
+                break
+            while j < n and _is_vowel_sign(word[j]):
+                j += 1
+        elif not (_is_independent_vowel(ch) or ch == OM):
+            # Avagraha, stray signs and non-Devanagari characters stand alone
+            aksharas.append(ch)
+            i = j
+            continue
+        while j < n and _is_modifier(word[j]):
+            j += 1
+        aksharas.append(word[i:j])
+        i = j
+    return aksharas
+
+
+def split_words(text: str) -> List[str]:
+    """Split verse text into words on whitespace, dandas and digits."""
+    words = []
+    current = []
+    for ch in text:
+        if ch.isspace() or ch in _SEPARATORS:
+            if current:
+                words.append("".join(current))
+                current = []
+        else:
+            current.append(ch)
+    if current:
+        words.append("".join(current))
+    return words
+
+
+def consonant_cluster(akshara: str) -> str:
+    """Return the consonant cluster of an akshara, without vowel or modifiers."""
+    end = 0
+    for idx, ch in enumerate(akshara):
+        if _is_consonant(ch) or ch == NUKTA:
+            end = idx + 1
+        elif ch == VIRAMA or ch in (ZWJ, ZWNJ):
+            continue
+        else:
+            break
+    return akshara[:end]
+
+
+def cluster_consonants(cluster: str) -> List[str]:
+    """Split a consonant cluster into its consonants (keeping nukta)."""
+    consonants = []
+    for ch in cluster:
+        if _is_consonant(ch):
+            consonants.append(ch)
+        elif ch == NUKTA and consonants:
+            consonants[-1] += ch
+    return consonants
+
+
+def akshara_features(akshara: str) -> int:
+    """Compute the phonetic feature flags of a single akshara."""
+    flags = 0
+    consonants = 0
+    for ch in akshara:
+        if _is_consonant(ch):
+            consonants += 1
+        if ch in RETROFLEX_CHARS:
+            flags |= RETROFLEX
+        if ch in ASPIRATE_CHARS:
+            flags |= ASPIRATE
+        if ch in SIBILANT_CHARS:
+            flags |= SIBILANT
+        if ch == VISARGA:
+            flags |= VISARGA_FLAG
+        elif ch in (ANUSVARA, CANDRABINDU):
+            flags |= ANUSVARA_FLAG
+    if consonants > 1:
+        flags |= CONJUNCT
+    if akshara.endswith(VIRAMA):
+        flags |= HALANT
+    return flags
+
+
+def feature_names(flags: int) -> List[str]:
+    """Expand feature flags into their names."""
+    return [name for flag, name in FEATURE_NAMES.items() if flags & flag]
+
+
+def akshara_difficulty(akshara: str, flags: int) -> int:
+    """Weighted difficulty of one akshara; longer conjuncts cost more."""
+    score = sum(weight for flag, weight in FEATURE_WEIGHTS.items() if flags & flag)
+    if flags & CONJUNCT:
+        score += len(cluster_consonants(consonant_cluster(akshara))) - 2
+    return score
+
+
+def _is_cluster_query(text: str) -> bool:
+    """True if text is a bare consonant cluster such as ``क्ष`` or ``ष``."""
+    if not text or not _is_consonant(text[0]) or text.endswith(VIRAMA):
+        return False
+    return all(_is_consonant(ch) or ch in (VIRAMA, NUKTA, ZWJ, ZWNJ) for ch in text)
+
+
+class PhoneticIndex:
+    """
+    Compact, array-backed phonetic index over the verse corpus.
+
+    Layout (all offsets are CSR-style: ``start[i]:start[i + 1]``):
+        verse id      -> word range      via ``_verse_word_start``
+        word id       -> akshara range   via ``_word_akshara_start``
+        akshara slot  -> akshara id      via ``_akshara_ids``
+        akshara id    -> text, features  via ``_akshara_table``/``_akshara_flags``
+
+    Postings map an akshara (or any contiguous consonant sub-cluster) to a
+    sorted ``array('H')`` of verse ids.
+    """
+
+    def __init__(self):
+        self._verse_refs: List[Tuple[int, int]] = []
+        self._verse_lookup: Dict[Tuple[int, int], int] = {}
+        self._verse_word_start = array("I", [0])
+        self._verse_difficulty = array("I")
+        self._word_akshara_start = array("I", [0])
+        self._word_difficulty = array("H")
+        self._word_flags = array("B")
+        self._akshara_ids = array("H")
+        self._akshara_table: List[str] = []
+        self._akshara_lookup: Dict[str, int] = {}
+        self._akshara_flags = array("B")
+        self._akshara_score = array("B")
+        self._akshara_postings: Dict[str, array] = {}
+        self._cluster_postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._verse_refs)
+
+    def _intern(self, akshara: str) -> int:
+        akshara_id = self._akshara_lookup.get(akshara)
+        if akshara_id is None:
+            akshara_id = len(self._akshara_table)
+            flags = akshara_features(akshara)
+            self._akshara_table.append(akshara)
+            self._akshara_lookup[akshara] = akshara_id
+            self._akshara_flags.append(flags)
+            self._akshara_score.append(min(akshara_difficulty(akshara, flags), 255))
+        return akshara_id
+
+    @staticmethod
+    def _post(postings: Dict[str, array], key: str, verse_id: int) -> None:
+        bucket = postings.get(key)
+        if bucket is None:
+            postings[key] = array("H", [verse_id])
+        elif bucket[-1] != verse_id:
+            bucket.append(verse_id)
+
+    def add_verse(self, chapter: int, verse: int, slok: str) -> None:
+        """
+        Segment and index a single verse.
+
+        Verses must be added at most once; ids are assigned in insertion order.
+        """
+        key = (chapter, verse)
+        if key in self._verse_lookup:
+            return
+        verse_id = len(self._verse_refs)
+        self._verse_refs.append(key)
+        self._verse_lookup[key] = verse_id
+
+        verse_score = 0
+        for word in split_words(slok):
+            word_score = 0
+            word_flags = 0
+            for akshara in segment_word(word):
+                akshara_id = self._intern(akshara)
+                self._akshara_ids.append(akshara_id)
+                word_score += self._akshara_score[akshara_id]
+                word_flags |= self._akshara_flags[akshara_id]
+
+                self._post(self._akshara_postings, akshara, verse_id)
+                consonants = cluster_consonants(consonant_cluster(akshara))
+                for start in range(len(consonants)):
+                    for end in range(start + 1, len(consonants) + 1):
+                        sub_cluster = VIRAMA.join(consonants[start:end])
+                        self._post(self._cluster_postings, sub_cluster, verse_id)
+
+            self._word_akshara_start.append(len(self._akshara_ids))
+            self._word_difficulty.append(min(word_score, 0xFFFF))
+            self._word_flags.append(word_flags)
+            verse_score += word_score
+
+        self._verse_word_start.append(len(self._word_difficulty))
+        self._verse_difficulty.append(verse_score)
+
+    def verses_containing(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find all verses containing an akshara or consonant cluster.
+
+        A bare consonant cluster (``क्ष``, ``ष``) matches any akshara built on
+        it (``क्षे``, ``लक्ष्मी``); anything else must match an akshara exactly.
+
+        Returns:
+            List of (chapter, verse) tuples in corpus order
+        """
+        text = text.strip()
+        if _is_cluster_query(text):
+            verse_ids = self._cluster_postings.get(text, ())
+        else:
+            verse_ids = self._akshara_postings.get(text, ())
+        return [self._verse_refs[verse_id] for verse_id in verse_ids]
+
+    def has_verse(self, chapter: int, verse: int) -> bool:
+        return (chapter, verse) in self._verse_lookup
+
+    def verse_difficulty(self, chapter: int, verse: int) -> Optional[int]:
+        verse_id = self._verse_lookup.get((chapter, verse))
+        if verse_id is None:
+            return None
+        return self._verse_difficulty[verse_id]
+
+    def verse_words(self, chapter: int, verse: int) -> Optional[List[Dict]]:
+        """
+        Per-word breakdown of a verse.
+
+        Returns:
+            List of dicts with text, aksharas, features and difficulty,
+            or None if the verse is not indexed
+        """
+        verse_id = self._verse_lookup.get((chapter, verse))
+        if verse_id is None:
+            return None
+        words = []
+        for word_id in range(self._verse_word_start[verse_id], self._verse_word_start[verse_id + 1]):
+            ids = self._akshara_ids[self._word_akshara_start[word_id]:self._word_akshara_start[word_id + 1]]
+            aksharas = [self._akshara_table[akshara_id] for akshara_id in ids]
+            words.append({
+                "text": "".join(aksharas),
+                "aksharas": aksharas,
+                "features": feature_names(self._word_flags[word_id]),
+                "difficulty": self._word_difficulty[word_id],
+            })
+        return words
+
+    def most_difficult_verses(self, limit: int, chapter: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        Highest-scoring verses, optionally restricted to one chapter.
+
+        Returns:
+            List of (chapter, verse, difficulty) tuples, hardest first
+        """
+        candidates = (
+            (self._verse_difficulty[verse_id], ref)
+            for verse_id, ref in enumerate(self._verse_refs)
+            if chapter is None or ref[0] == chapter
+        )
+        return [(ref[0], ref[1], score) for score, ref in heapq.nlargest(limit, candidates)]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "verses": len(self._verse_refs),
+            "words": len(self._word_difficulty),
+            "aksharas": len(self._akshara_ids),
+            "distinct_aksharas": len(self._akshara_table),
+            "distinct_clusters": len(self._cluster_postings),
+        }
+
+
+def build_index(verses: Iterable[Tuple[int, int, str]]) -> PhoneticIndex:
+    """Build a phonetic index from (chapter, verse, slok) tuples."""
+    index = PhoneticIndex()
+    for chapter, verse, slok in verses:
+        index.add_verse(chapter, verse, slok)
+    return index
+
+
+class PhoneticIndexService:
+    """
+    Builds the corpus-wide phonetic index once per process.
+
+    If some chapters or verses fail to load, the partial index is kept and
+    served, and the build is retried in the background with exponential
+    backoff (``retry_delay`` doubling up to ``max_retry_delay``) until the
+    corpus is complete. Requests never trigger a refetch themselves. At most
+    ``settings.warmup_concurrency`` upstream fetches run at once per build.
+    """
+
+    retry_delay = 5.0
+    max_retry_delay = 300.0
+
+    def __init__(self):
+        self._index: Optional[PhoneticIndex] = None
+        self._complete = False
+        self._lock = asyncio.Lock()
+        self._retry_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the index covers the whole corpus."""
+        return self._complete
+
+    async def _load_chapter(self, chapter: int, limit: asyncio.Semaphore) -> Optional[Dict]:
+        try:
+            return await vedic_service.get_chapter_with_verses(chapter, limit)
+        except HTTPException as e:
+            logger.warning(f"Phonetic index: chapter {chapter} failed to load: {e.detail}")
+            return None
+
+    async def _build(self) -> Tuple[PhoneticIndex, bool]:
+        """Fetch and index the corpus; returns the index and whether it is complete."""
+        # The corpus is ~720 upstream GETs; don't send them all at once
+        limit = asyncio.Semaphore(settings.warmup_concurrency)
+        chapters = await asyncio.gather(*(self._load_chapter(chapter, limit) for chapter in range(1, 19)))
+        loaded = [chapter_data for chapter_data in chapters if chapter_data is not None]
+        index = build_index(
+            (verse["chapter"], verse["verse"], verse["slok"])
+            for chapter_data in loaded
+            for verse in chapter_data["verses"]
+        )
+        expected = sum(chapter_data.get("verses_count", 0) for chapter_data in loaded)
+        return index, len(loaded) == len(chapters) and len(index) >= expected
+
+    async def _retry(self) -> None:
+        delay = self.retry_delay
+        while not self._complete:
+            await asyncio.sleep(delay)
+            try:
+                index, complete = await self._build()
+            except Exception:
+                logger.exception("Phonetic index rebuild failed")
+            else:
+                if self._index is None or len(index) >= len(self._index):
+                    self._index = index
+                self._complete = complete
+            delay = min(delay * 2, self.max_retry_delay)
+        logger.info(f"Phonetic index complete ({len(self._index)} verses)")
+
+    async def get_index(self) -> PhoneticIndex:
+        """
+        Return the phonetic index, fetching and segmenting the corpus on first use.
+
+        Raises:
+            HTTPException: 503 if no verses could be loaded yet
+        """
+        if self._index is not None:
+            return self._index
+        async with self._lock:
+            if self._index is None and self._retry_task is None:
+                index, complete = await self._build()
+                if len(index):
+                    self._index = index
+                self._complete = complete
+                if not complete:
+                    logger.warning(f"Phonetic index incomplete ({len(index)} verses); retrying in the background")
+                    self._retry_task = asyncio.create_task(self._retry())
+        if self._index is None:
+            raise HTTPException(status_code=503, detail="Verse corpus is unavailable")
+        return self._index
+
+    async def stop(self) -> None:
+        """Cancel a pending background rebuild (called on application shutdown)."""
+        if self._retry_task is not None and not self._retry_task.done():
+            self._retry_task.cancel()
+            try:
+                await self._retry_task
+            except asyncio.CancelledError:
+                pass
+
+
+# Singleton instance
+phonetic_index_service = PhoneticIndexService()
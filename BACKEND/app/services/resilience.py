@@ -0,0 +1,255 @@
+"""
+Resilience primitives for upstream calls.
+
+- ``LatencyTracker``: rolling window of successful call latencies per host,
+  used to derive an adaptive timeout (``p99 * multiplier``, clamped) and the
+  hedge delay (``p95``).
+- ``CircuitBreaker``: per-host breaker that opens after consecutive failures,
+  fails fast while open and lets a single probe through after a cool-down.
+- ``UpstreamResilience``: issues idempotent GETs with adaptive timeouts and a
+  hedged duplicate request when the first one is slower than usual. Hedges
+  are limited by a budget (a fraction of requests) and are not sent while
+  many requests to the host are in flight: in a fan-out, slowness is mostly
+  local queueing for a pooled connection, and hedging would double the load.
+
+Breaker state, adaptive timeouts and hedge win-rates are exported as metrics.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+import httpx
+
+from ..config import settings
+from ..metrics import (
+    upstream_circuit_rejections_total,
+    upstream_circuit_state,
+    upstream_hedge_win_ratio,
+    upstream_hedge_wins_total,
+    upstream_hedges_suppressed_total,
+    upstream_hedges_total,
+    upstream_timeout_seconds,
+)
+
+# Numeric values of breaker states for the upstream_circuit_state gauge
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+# Maximum unspent hedges a host can accumulate
+HEDGE_BURST = 5.0
+
+
+class LatencyTracker:
+    """Rolling window of successful upstream latencies for one host."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until enough samples are collected."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+    def timeout(self) -> float:
+        """Adaptive timeout: a multiple of p99, clamped to the configured bounds."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return settings.upstream_timeout
+        return min(max(p99 * settings.upstream_timeout_multiplier, settings.upstream_timeout_min),
+                   settings.upstream_timeout)
+
+    def hedge_delay(self) -> float:
+        """How long to wait for the first request before sending a hedge."""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return settings.upstream_hedge_default_delay
+        return max(p95, settings.upstream_hedge_min_delay)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after ``failure_threshold`` consecutive failures;
+    open -> half_open after ``reset_timeout`` seconds; half_open lets one
+    probe through and closes on success or re-opens on failure.
+
+    ``allow()`` hands out a token per call that must be passed back with
+    the outcome, so only the call that owns the half-open probe can free
+    it; a late call that started before the breaker opened cannot let a
+    second probe through.
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._tokens = itertools.count(1)
+        self._probe_owner: Optional[int] = None
+        upstream_circuit_state.set(CIRCUIT_STATES["closed"], host=host)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        upstream_circuit_state.set(CIRCUIT_STATES[state], host=self.host)
+
+    def allow(self) -> Optional[int]:
+        """Return a call token if a call may be attempted now, or None to fail fast."""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                upstream_circuit_rejections_total.inc(host=self.host)
+                return None
+            self._transition("half_open")
+        token = next(self._tokens)
+        if self.state == "half_open":
+            if self._probe_owner is not None:
+                upstream_circuit_rejections_total.inc(host=self.host)
+                return None
+            self._probe_owner = token
+        return token
+
+    def _end_call(self, token: int) -> None:
+        if token == self._probe_owner:
+            self._probe_owner = None
+
+    def record_success(self, token: int) -> None:
+        self._failures = 0
+        self._end_call(token)
+        if self.state != "closed":
+            self._probe_owner = None
+            self._transition("closed")
+
+    def release(self, token: int) -> None:
+        """Give up a call without an outcome (e.g. it was cancelled), freeing its probe."""
+        self._end_call(token)
+
+    def record_failure(self, token: int) -> None:
+        self._failures += 1
+        self._end_call(token)
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition("open")
+
+
+class UpstreamResilience:
+    """Per-host breakers, latency trackers and hedged GETs."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._hedges: Dict[str, int] = {}
+        self._hedge_wins: Dict[str, int] = {}
+        self._hedge_tokens: Dict[str, float] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                host, settings.breaker_failure_threshold, settings.breaker_reset_timeout
+            )
+        return breaker
+
+    def latency(self, host: str) -> LatencyTracker:
+        tracker = self._latency.get(host)
+        if tracker is None:
+            tracker = self._latency[host] = LatencyTracker()
+        return tracker
+
+    def _earn_hedge_token(self, host: str) -> None:
+        """Each request earns ``upstream_hedge_budget`` of a hedge, capped to allow small bursts."""
+        tokens = self._hedge_tokens.get(host, 0.0) + settings.upstream_hedge_budget
+        self._hedge_tokens[host] = min(tokens, HEDGE_BURST)
+
+    def _may_hedge(self, host: str) -> bool:
+        """Spend a hedge token unless the budget is used up or the host is busy."""
+        if self._in_flight.get(host, 0) > settings.upstream_hedge_max_in_flight:
+            upstream_hedges_suppressed_total.inc(host=host, reason="in_flight")
+            return False
+        if self._hedge_tokens.get(host, 0.0) < 1.0:
+            upstream_hedges_suppressed_total.inc(host=host, reason="budget")
+            return False
+        self._hedge_tokens[host] -= 1.0
+        return True
+
+    def _record_hedge(self, host: str, won: bool) -> None:
+        self._hedges[host] = self._hedges.get(host, 0) + 1
+        upstream_hedges_total.inc(host=host)
+        if won:
+            self._hedge_wins[host] = self._hedge_wins.get(host, 0) + 1
+            upstream_hedge_wins_total.inc(host=host)
+        upstream_hedge_win_ratio.set(self._hedge_wins.get(host, 0) / self._hedges[host], host=host)
+
+    @staticmethod
+    async def _first_response(tasks: Set["asyncio.Task[httpx.Response]"]) -> "asyncio.Task[httpx.Response]":
+        """
+        Wait for the first task that yields a non-5xx response.
+
+        Falls back to the last finished task (response or exception) when
+        every task fails.
+        """
+        pending = set(tasks)
+        last = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                last = task
+                if task.exception() is None and task.result().status_code < 500:
+                    return task
+        return last
+
+    async def get(self, client: httpx.AsyncClient, url: str, host: str) -> httpx.Response:
+        """
+        GET with an adaptive timeout, hedging slow requests.
+
+        Only use for idempotent requests: when the first request is still
+        pending after the hedge delay, an identical request is sent and the
+        first good response wins; the other request is cancelled. Hedges
+        are subject to the hedge budget and in-flight limit.
+        """
+        tracker = self.latency(host)
+        timeout = tracker.timeout()
+        upstream_timeout_seconds.set(timeout, host=host)
+        start = time.perf_counter()
+        self._earn_hedge_token(host)
+        self._in_flight[host] = self._in_flight.get(host, 0) + 1
+
+        primary = asyncio.ensure_future(client.get(url, timeout=timeout))
+        tasks = {primary}
+        try:
+            winner = primary
+            if settings.upstream_hedging_enabled:
+                done, _ = await asyncio.wait(tasks, timeout=tracker.hedge_delay())
+                if not done and self._may_hedge(host):
+                    hedge = asyncio.ensure_future(client.get(url, timeout=timeout))
+                    tasks.add(hedge)
+                    winner = await self._first_response(tasks)
+                    # Only a good hedge response is a win, not the last of two failures
+                    self._record_hedge(host, won=(
+                        winner is hedge and winner.exception() is None and winner.result().status_code < 500
+                    ))
+            response = await winner
+        finally:
+            self._in_flight[host] -= 1
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if response.status_code < 500:
+            tracker.observe(time.perf_counter() - start)
+        return response
+
+
+# Singleton instance
+upstream_resilience = UpstreamResilience()
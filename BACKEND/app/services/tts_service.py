@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict
+
+from gtts import gTTS
+
+from ..config import settings
+from ..metrics import (
+    tts_bytes_total,
+    tts_jobs_queued,
+    tts_queue_wait_seconds,
+    tts_requests_total,
+    tts_synthesis_seconds,
+    tts_workers_busy,
+)
+from .cache import audio_store
+
+logger = logging.getLogger(__name__)
+
+class TTSService:
+    """
+    Runs blocking gTTS synthesis on a bounded worker pool.
+
+    gTTS performs synchronous HTTP calls, so synthesizing on the event loop
+    would stall every other request; the pool also bounds how many
+    synthesis calls run at once and makes queueing observable.
+    """
+
+    def __init__(self, max_workers: int = settings.tts_max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._queued = 0
+
+    def _dequeue(self, job: Dict[str, bool], start: bool) -> None:
+        """Take a job off the queue count exactly once, either when it starts or when it is dropped."""
+        with self._lock:
+            if job["dequeued"]:
+                return
+            job["dequeued"] = True
+            self._queued -= 1
+            if start:
+                self._busy += 1
+            tts_jobs_queued.set(self._queued)
+            tts_workers_busy.set(self._busy)
+
+    def _synthesize_blocking(self, text: str, submitted_at: float, job: Dict[str, bool]) -> bytes:
+        """Synthesize speech on a worker thread, recording queue wait and synthesis time."""
+        started_at = time.perf_counter()
+        self._dequeue(job, start=True)
+        tts_queue_wait_seconds.observe(started_at - submitted_at)
+
+        try:
+            # Generate speech using Google TTS (Hindi with Indian accent)
+            tts = gTTS(text=text, lang='hi', slow=False, tld='co.in')
+            buffer = BytesIO()
+            tts.write_to_fp(buffer)
+            audio_bytes = buffer.getvalue()
+        except Exception:
+            tts_requests_total.inc(outcome="error")
+            raise
+        finally:
+            tts_synthesis_seconds.observe(time.perf_counter() - started_at)
+            with self._lock:
+                self._busy -= 1
+                tts_workers_busy.set(self._busy)
+
+        tts_requests_total.inc(outcome="success")
+        tts_bytes_total.inc(len(audio_bytes))
+        return audio_bytes
+
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize MP3 audio for Devanagari text.
+
+        Audio is served from the shared on-disk audio store when available;
+        newly synthesized audio is written back so other workers reuse it.
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            MP3 audio bytes
+        """
+        cached = audio_store.get(text)
+        if cached is not None:
+            return cached
+        audio_bytes = await self._run_synthesis(text)
+        try:
+            audio_store.put(text, audio_bytes)
+        except OSError as e:
+            logger.warning(f"Could not cache TTS audio: {e}")
+        return audio_bytes
+
+    async def _run_synthesis(self, text: str) -> bytes:
+        """
+        Queue a synthesis job on the worker pool.
+
+        A job cancelled while still queued (client disconnect, warm-up
+        stop) never reaches a worker, so it is taken off the queue count
+        when its future completes rather than on the worker thread.
+        """
+        job = {"dequeued": False}
+        with self._lock:
+            self._queued += 1
+            tts_jobs_queued.set(self._queued)
+        future = self._executor.submit(self._synthesize_blocking, text, time.perf_counter(), job)
+        future.add_done_callback(lambda _: self._dequeue(job, start=False))
+        return await asyncio.wrap_future(future)
+
+    def pool_status(self) -> Dict[str, float]:
+        """Current worker pool usage; saturation of 1.0 or more means jobs are waiting."""
+        with self._lock:
+            busy, queued = self._busy, self._queued
+        return {
+            "max_workers": self.max_workers,
+            "busy": busy,
+            "queued": queued,
+            "saturation": round((busy + queued) / self.max_workers, 3),
+        }
+
+    @property
+    def is_saturated(self) -> bool:
+        with self._lock:
+            return self._queued > 0 and self._busy >= self.max_workers
+
+
+# Singleton instance
+tts_service = TTSService()
@@ -1,10 +1,23 @@
 import asyncio
 import httpx
 import random
-from typing import List, Optional, Dict, Any
+import re
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 from fastapi import HTTPException
 
 from ..config import settings
+from ..metrics import (
+    cache_lookups_total,
+    upstream_errors_total,
+    upstream_fallbacks_total,
+    upstream_request_duration_seconds,
+    upstream_retries_total,
+)
+from ..profiling import span
+from .cache import MemoryCache, corpus_store
+from .resilience import upstream_resilience
 
 
 class VedicScripturesService:
@@ -12,7 +25,14 @@ class VedicScripturesService:
     
     def __init__(self):
         self.base_url = settings.vedic_api_base_url
-        self.timeout = 30.0
+        self.host = httpx.URL(self.base_url).host
+        self.timeout = settings.upstream_timeout
+        self._upstream_reachable: Optional[bool] = None
+        self._upstream_checked_at = 0.0
+        self._memory_cache = MemoryCache(settings.cache_max_entries, settings.cache_ttl)
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def _clean_slok_text(self, slok: str) -> str:
         """
@@ -24,42 +44,217 @@ class VedicScripturesService:
         Returns:
             Cleaned slok text without the verse reference pattern
         """
-        import re
         # Remove the ||chapter-verse|| pattern (e.g., ||१-१||, ||२-५||, etc.)
         # This pattern appears at the end of verses
         cleaned = re.sub(r'\s*\|\|[०-९\d]+-[०-९\d]+\|\|\s*$', '', slok)
         return cleaned.strip()
     
+    @property
+    def memory_cache_size(self) -> int:
+        """Number of upstream responses cached in this worker's memory."""
+        return len(self._memory_cache)
+    
+    @staticmethod
+    def _endpoint_label(endpoint: str) -> str:
+        """Collapse numeric path segments so metrics are labelled per endpoint, not per URL."""
+        return re.sub(r"/\d+", "/{n}", endpoint.rstrip("/")) or "/"
+    
+    def _record_upstream(self, reachable: bool) -> None:
+        """Remember the latest upstream outcome for health reporting."""
+        self._upstream_reachable = reachable
+        self._upstream_checked_at = time.monotonic()
+    
     async def _fetch_json(self, endpoint: str) -> Any:
-        """Fetch JSON data from the API."""
+        """
+        Fetch JSON data, consulting the cache tiers before the API.
+        
+        Lookup order: this worker's memory cache, the shared memory-mapped
+        corpus file, then upstream. Concurrent requests for the same
+        endpoint share a single upstream call. Corpus hits are not copied
+        into memory, so workers don't each hold their own copy of the corpus.
+        If upstream fails (or its circuit is open), expired memory entries
+        are served as a fallback.
+        """
         # Ensure endpoint ends with trailing slash (required by GitHub Pages)
         if not endpoint.endswith('/'):
             endpoint = f"{endpoint}/"
         
-        url = f"{self.base_url}{endpoint}"
+        data = self._memory_cache.get(endpoint)
+        if data is not None:
+            cache_lookups_total.inc(tier="memory", result="hit")
+            return data
+        cache_lookups_total.inc(tier="memory", result="miss")
+        
+        data = corpus_store.get(endpoint)
+        if data is not None:
+            cache_lookups_total.inc(tier="corpus", result="hit")
+            return data
+        cache_lookups_total.inc(tier="corpus", result="miss")
+        
+        pending = self._inflight.get(endpoint)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_upstream(endpoint))
+            self._inflight[endpoint] = pending
+            pending.add_done_callback(lambda future: self._finish_fetch(endpoint, future))
+        try:
+            # Shielded so a cancelled caller doesn't cancel the fetch for the others
+            return await asyncio.shield(pending)
+        except HTTPException as e:
+            stale = self._stale_fallback(endpoint, e)
+            if stale is None:
+                raise
+            return stale
+    
+    def _finish_fetch(self, endpoint: str, future: "asyncio.Future[Any]") -> None:
+        """Drop a completed shared fetch and cache its result."""
+        self._inflight.pop(endpoint, None)
+        if not future.cancelled() and future.exception() is None:
+            self._memory_cache.set(endpoint, future.result())
+    
+    def _stale_fallback(self, endpoint: str, error: HTTPException) -> Optional[Any]:
+        """
+        Expired data to serve instead of an upstream failure, if any.
         
-        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+        Used by every caller waiting on a failed fetch, not just the one
+        that started it, so an outage stampede is answered from cache.
+        """
+        if error.status_code < 500:
+            return None
+        stale = self._memory_cache.get_stale(endpoint)
+        if stale is not None:
+            upstream_fallbacks_total.inc(endpoint=self._endpoint_label(endpoint))
+        return stale
+    
+    def create_client(self) -> httpx.AsyncClient:
+        """HTTP client for upstream calls; share one across bulk fetches to reuse connections."""
+        return httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+    
+    def _shared_client(self) -> httpx.AsyncClient:
+        """
+        Long-lived client for this event loop.
+        
+        Reusing one client keeps upstream connections alive and avoids
+        building a TLS context per call, which dominates when fetching
+        many verses (e.g. chapter fan-out or the phonetic index build).
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = self.create_client()
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the shared upstream client (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _fetch_upstream(self, endpoint: str, client: Optional[httpx.AsyncClient] = None) -> Any:
+        """
+        Fetch JSON data from the API through the resilience layer.
+        
+        Calls go through the host's circuit breaker (failing fast while it
+        is open) and use an adaptive timeout with hedging for slow requests.
+        Network errors and 5xx responses are retried up to
+        ``settings.upstream_max_retries`` times with linear backoff; 4xx
+        responses fail immediately.
+        
+        Args:
+            endpoint: API path, e.g. ``/slok/2/47/``
+            client: Client to use instead of the shared one
+        """
+        if client is None:
+            client = self._shared_client()
+        
+        url = f"{self.base_url}{endpoint}"
+        label = self._endpoint_label(endpoint)
+        attempts = settings.upstream_max_retries + 1
+        breaker = upstream_resilience.breaker(self.host)
+        
+        for attempt in range(attempts):
+            if attempt:
+                upstream_retries_total.inc(endpoint=label)
+                await asyncio.sleep(settings.upstream_retry_backoff * attempt)
+            
+            token = breaker.allow()
+            if token is None:
+                upstream_errors_total.inc(endpoint=label, reason="circuit_open")
+                self._record_upstream(False)
+                raise HTTPException(
+                    status_code=503,
+                    detail="Service unavailable: Vedic Scriptures API is failing, circuit open"
+                )
+            
+            start = time.perf_counter()
             try:
-                response = await client.get(url)
-                response.raise_for_status()
-                response.encoding = 'utf-8'  # Ensure proper UTF-8 decoding
-                return response.json()
+                with span("upstream_fetch"):
+                    response = await upstream_resilience.get(client, url, self.host)
+                    response.raise_for_status()
+                    response.encoding = 'utf-8'  # Ensure proper UTF-8 decoding
+                    data = response.json()
+                upstream_request_duration_seconds.observe(time.perf_counter() - start, endpoint=label)
+                breaker.record_success(token)
+                self._record_upstream(True)
+                return data
             except httpx.HTTPStatusError as e:
+                upstream_request_duration_seconds.observe(time.perf_counter() - start, endpoint=label)
+                status_code = e.response.status_code
+                upstream_errors_total.inc(endpoint=label, reason=str(status_code))
+                if status_code < 500:
+                    # Upstream answered; a missing verse is not an outage
+                    breaker.record_success(token)
+                else:
+                    breaker.record_failure(token)
+                    if attempt + 1 < attempts:
+                        continue
+                self._record_upstream(status_code < 500)
                 raise HTTPException(
-                    status_code=e.response.status_code,
+                    status_code=status_code,
                     detail=f"Failed to fetch data from Vedic Scriptures API: {str(e)}"
                 )
             except httpx.RequestError as e:
+                upstream_request_duration_seconds.observe(time.perf_counter() - start, endpoint=label)
+                upstream_errors_total.inc(endpoint=label, reason=type(e).__name__)
+                breaker.record_failure(token)
+                if attempt + 1 < attempts:
+                    continue
+                self._record_upstream(False)
                 raise HTTPException(
                     status_code=503,
                     detail=f"Service unavailable: {str(e)}"
                 )
+            except asyncio.CancelledError:
+                breaker.release(token)
+                raise
             except Exception as e:
+                upstream_errors_total.inc(endpoint=label, reason="unexpected")
+                breaker.record_failure(token)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Unexpected error: {str(e)}"
                 )
     
+    async def check_upstream(self) -> bool:
+        """
+        Report whether the Vedic Scriptures API is reachable.
+        
+        Reuses the outcome of recent upstream calls and only probes
+        when nothing has been observed for ``settings.health_check_interval``.
+        """
+        now = time.monotonic()
+        if (
+            self._upstream_reachable is not None
+            and now - self._upstream_checked_at < settings.health_check_interval
+        ):
+            return self._upstream_reachable
+        
+        try:
+            response = await self._shared_client().get(f"{self.base_url}/chapter/1/", timeout=5.0)
+            self._record_upstream(response.status_code < 500)
+        except httpx.HTTPError:
+            self._record_upstream(False)
+        return self._upstream_reachable
+    
     def _extract_translation(self, data: Dict, author_key: str, text_key: str) -> Optional[str]:
         """Extract translation text for a specific author from nested structure."""
         author_data = data.get(author_key, {})
@@ -81,23 +276,24 @@ class VedicScripturesService:
         endpoint = f"/slok/{chapter}/{verse}"
         data = await self._fetch_json(endpoint)
         
-        # Extract translations from nested structure
-        # Hindi: Swami Ramsukhdas (rams.ht key)
-        # English: Swami Gambirananda (gambir.et key)
-        hindi_translation = self._extract_translation(data, "rams", "ht")
-        english_translation = self._extract_translation(data, "gambir", "et")
-        
-        # Clean the slok text to remove ||chapter-verse|| pattern
-        slok_text = self._clean_slok_text(data.get("slok", ""))
-        
-        return {
-            "chapter": chapter,
-            "verse": verse,
-            "slok": slok_text,
-            "transliteration": data.get("transliteration", ""),
-            "hindi_translation": hindi_translation,
-            "english_translation": english_translation
-        }
+        with span("transform"):
+            # Extract translations from nested structure
+            # Hindi: Swami Ramsukhdas (rams.ht key)
+            # English: Swami Gambirananda (gambir.et key)
+            hindi_translation = self._extract_translation(data, "rams", "ht")
+            english_translation = self._extract_translation(data, "gambir", "et")
+            
+            # Clean the slok text to remove ||chapter-verse|| pattern
+            slok_text = self._clean_slok_text(data.get("slok", ""))
+            
+            return {
+                "chapter": chapter,
+                "verse": verse,
+                "slok": slok_text,
+                "transliteration": data.get("transliteration", ""),
+                "hindi_translation": hindi_translation,
+                "english_translation": english_translation
+            }
     
     async def get_random_verse_from_chapter(self, chapter: int) -> Dict[str, Any]:
         """
@@ -160,31 +356,42 @@ class VedicScripturesService:
         endpoint = f"/chapter/{chapter}"
         data = await self._fetch_json(endpoint)
         
-        return {
-            "chapter_number": chapter,
-            "name": data.get("name", ""),
-            "translation": data.get("translation", ""),
-            "verses_count": data.get("verses_count", 0),
-            "summary": data.get("summary", {}),
-        }
+        with span("transform"):
+            return {
+                "chapter_number": chapter,
+                "name": data.get("name", ""),
+                "translation": data.get("translation", ""),
+                "verses_count": data.get("verses_count", 0),
+                "summary": data.get("summary", {}),
+            }
     
-    async def get_chapter_with_verses(self, chapter: int) -> Dict[str, Any]:
+    async def get_chapter_with_verses(
+        self, chapter: int, limit: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, Any]:
         """
         Get chapter information along with all its verses (optimized with concurrent requests).
         
         Args:
             chapter: Chapter number (1-18)
+            limit: Optional semaphore held for each fetch, bounding how many
+                run at once (shared across chapters when loading the corpus)
             
         Returns:
             Dict containing chapter details and all verses
         """
-        chapter_data = await self.get_chapter(chapter)
+        async def limited(call: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+            if limit is None:
+                return await call
+            async with limit:
+                return await call
+        
+        chapter_data = await limited(self.get_chapter(chapter))
         verses_count = chapter_data.get("verses_count", 0)
         
         # Fetch all verses concurrently instead of sequentially
         async def fetch_verse(verse_num: int) -> Optional[Dict[str, Any]]:
             try:
-                return await self.get_verse(chapter, verse_num)
+                return await limited(self.get_verse(chapter, verse_num))
             except HTTPException:
                 return None
         
@@ -198,24 +405,22 @@ class VedicScripturesService:
         chapter_data["verses"] = verses
         return chapter_data
     
-    async def get_verse_of_the_day(self) -> Dict[str, Any]:
+    def verse_of_the_day_ref(self, day: date) -> Tuple[int, int]:
         """
-        Get verse of the day based on current date.
+        Select the verse of the day for a given date.
         
         Uses a deterministic algorithm based on date to select a verse,
         ensuring the same verse is returned for the same day.
         
+        Args:
+            day: Calendar date
+            
         Returns:
-            Dict containing verse data for today
+            Tuple of (chapter, verse)
         """
-        from datetime import datetime
-        
-        # Use current date as seed for deterministic selection
-        today = datetime.now()
-        
         # Create a unique number for each day using year, month, and day
         # This ensures different verses for different days across years
-        day_seed = today.year * 10000 + today.month * 100 + today.day
+        day_seed = day.year * 10000 + day.month * 100 + day.day
         
         # Chapter verse counts (Bhagavad Gita)
         chapter_verses = {
@@ -241,6 +446,19 @@ class VedicScripturesService:
                 break
             cumulative += count
         
+        return selected_chapter, selected_verse
+    
+    async def get_verse_of_the_day(self) -> Dict[str, Any]:
+        """
+        Get verse of the day based on current date.
+        
+        Returns:
+            Dict containing verse data for today
+        """
+        # Use current date as seed for deterministic selection
+        today = datetime.now()
+        selected_chapter, selected_verse = self.verse_of_the_day_ref(today.date())
+        
         # Fetch the verse
         verse_data = await self.get_verse(selected_chapter, selected_verse)
         verse_data["verse_of_the_day"] = True
@@ -0,0 +1,205 @@
+"""
+Startup warm-up and readiness.
+
+On startup the app preloads chapter metadata, today's and tomorrow's verse
+of the day, the most-requested verses and their TTS audio, and then builds
+the phonetic index, with bounded concurrency. ``/health`` reports not-ready
+until warm-up finishes so load balancers only route traffic to warm
+instances.
+
+Verse popularity is counted per process and merged into
+``CACHE_DIR/popular_verses.json`` on shutdown, so the next deploy warms
+the verses users actually ask for.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .cache import CACHE_DIR
+from .phonetic_index import phonetic_index_service
+from .tts_service import tts_service
+from .vedic_service import vedic_service
+
+logger = logging.getLogger(__name__)
+
+
+class VersePopularity:
+    """Counts verse requests and persists them across restarts."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._counts: Counter = Counter()
+
+    def record(self, chapter: int, verse: int) -> None:
+        self._counts[(chapter, verse)] += 1
+
+    def _load(self) -> Counter:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return Counter()
+        counts = Counter()
+        if not isinstance(raw, dict):
+            logger.warning(f"Ignoring malformed verse popularity file {self.path}")
+            return counts
+        for key, count in raw.items():
+            try:
+                chapter, verse = key.split(".")
+                counts[(int(chapter), int(verse))] = int(count)
+            except (TypeError, ValueError):
+                logger.warning(f"Skipping malformed verse popularity entry {key!r}")
+        return counts
+
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        """Most requested verses, combining persisted and in-process counts."""
+        counts = self._load()
+        counts.update(self._counts)
+        return [ref for ref, _ in counts.most_common(n)]
+
+    def save(self) -> None:
+        """Merge this process's counts into the persisted file and reset them."""
+        if not self._counts:
+            return
+        counts = self._load()
+        counts.update(self._counts)
+        payload = json.dumps({f"{ch}.{v}": count for (ch, v), count in counts.most_common(1000)})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._counts.clear()
+
+
+class WarmupService:
+    """Runs the startup warm-up and tracks readiness."""
+
+    def __init__(self):
+        self.state = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.completed = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        # Every terminal state is ready: a failed warm-up must not keep the
+        # instance out of rotation, it just serves from colder caches
+        return self.state in ("complete", "disabled", "timed_out", "failed")
+
+    def status(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.monotonic()) - self.started_at, 2)
+        return {
+            "state": self.state,
+            "ready": self.is_ready,
+            "completed": self.completed,
+            "failed": self.failed,
+            "duration_seconds": duration,
+        }
+
+    async def _job(self, semaphore: asyncio.Semaphore, label: str, make_call) -> Any:
+        async with semaphore:
+            try:
+                result = await make_call()
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Warm-up {label} failed: {e}")
+                return None
+            self.completed += 1
+            return result
+
+    async def _gather(self, semaphore: asyncio.Semaphore, jobs: Dict[str, Any]) -> List[Any]:
+        return await asyncio.gather(*(self._job(semaphore, label, call) for label, call in jobs.items()))
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(settings.warmup_concurrency)
+
+        # Chapter metadata backs /chapters, /chapter-names and verse counts
+        await self._gather(semaphore, {
+            f"chapter {ch}": (lambda ch=ch: vedic_service.get_chapter(ch))
+            for ch in range(1, 19)
+        })
+
+        today = date.today()
+        refs = [
+            vedic_service.verse_of_the_day_ref(today),
+            vedic_service.verse_of_the_day_ref(today + timedelta(days=1)),
+        ]
+        for ref in verse_popularity.top(settings.warmup_top_n):
+            if ref not in refs:
+                refs.append(ref)
+
+        verses = await self._gather(semaphore, {
+            f"verse {ch}.{v}": (lambda ch=ch, v=v: vedic_service.get_verse(ch, v))
+            for ch, v in refs
+        })
+
+        if settings.warmup_tts:
+            # Same text the app sends for playback: the cleaned slok
+            await self._gather(semaphore, {
+                f"audio {verse['chapter']}.{verse['verse']}": (lambda text=verse["slok"]: tts_service.synthesize(text))
+                for verse in verses
+                if verse and verse.get("slok")
+            })
+
+        # Last, as it loads the whole corpus. The build bounds its own fetches
+        # to warmup_concurrency; /health reports warming_up until it finishes
+        # and degraded afterwards while the index is still incomplete
+        await self._gather(semaphore, {"phonetic index": phonetic_index_service.get_index})
+
+    async def run(self) -> None:
+        """Run the warm-up once, marking the service ready when done, timed out or failed."""
+        if not settings.warmup_enabled:
+            self.state = "disabled"
+            return
+        self.state = "running"
+        self.started_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._run(), timeout=settings.warmup_timeout)
+            self.state = "complete"
+        except asyncio.TimeoutError:
+            # Don't keep an instance out of rotation forever; serve what is warm
+            self.state = "timed_out"
+            logger.warning(f"Warm-up timed out after {settings.warmup_timeout}s")
+        except Exception:
+            self.state = "failed"
+            logger.exception("Warm-up failed")
+        finally:
+            self.finished_at = time.monotonic()
+        logger.info(
+            f"Warm-up {self.state}: {self.completed} loaded, {self.failed} failed "
+            f"in {self.finished_at - self.started_at:.1f}s"
+        )
+
+    def start(self) -> None:
+        """Start the warm-up in the background so the server can answer health checks."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Singleton instances
+verse_popularity = VersePopularity(CACHE_DIR / "popular_verses.json")
+warmup_service = WarmupService()
@@ -0,0 +1,43 @@
+"""
+Fake TTS engine with the subset of the ``gTTS`` interface used by the app.
+
+Synthesis time and output size scale with text length so TTS bursts exercise
+the worker pool realistically without network access.
+"""
+
+import hashlib
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+
+class FakeGTTS:
+    """Drop-in replacement for ``gtts.gTTS``."""
+
+    # Seconds of synthesis per call plus per character of input
+    base_seconds = 0.05
+    per_char_seconds = 0.001
+    # Roughly the MP3 size gTTS produces per character of Devanagari
+    bytes_per_char = 400
+
+    def __init__(self, text: str, lang: str = "hi", slow: bool = False, tld: str = "co.in"):
+        self.text = text
+
+    def write_to_fp(self, fp: BinaryIO) -> None:
+        time.sleep(self.base_seconds + self.per_char_seconds * len(self.text))
+        digest = hashlib.sha256(self.text.encode("utf-8")).digest()
+        size = max(len(self.text) * self.bytes_per_char, len(digest))
+        fp.write((digest * (size // len(digest) + 1))[:size])
+
+
+@contextmanager
+def patched_tts() -> Iterator[None]:
+    """Swap the TTS service's engine for ``FakeGTTS`` for the duration of the block."""
+    from app.services import tts_service as module
+
+    original = module.gTTS
+    module.gTTS = FakeGTTS
+    try:
+        yield
+    finally:
+        module.gTTS = original
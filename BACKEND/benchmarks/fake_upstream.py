@@ -0,0 +1,207 @@
+"""
+Local stand-in for the Vedic Scriptures API.
+
+Serves ``/chapter/{n}/`` and ``/slok/{chapter}/{verse}/`` from recorded JSON
+in ``benchmarks/fixtures`` (see ``benchmarks/record.py``). Anything that has
+not been recorded is synthesized with the same shape, so the suite runs fully
+offline. Latency and error injection are configurable per instance.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Bhagavad Gita verse counts per chapter
+CHAPTER_VERSES = {
+    1: 47, 2: 72, 3: 43, 4: 42, 5: 29, 6: 47,
+    7: 30, 8: 28, 9: 34, 10: 42, 11: 55, 12: 20,
+    13: 35, 14: 27, 15: 20, 16: 24, 17: 28, 18: 78
+}
+
+# Well-known verses whose vocabulary is used to synthesize unrecorded sloks,
+# so the synthetic corpus has a realistic mix of conjuncts, retroflexes,
+# aspirates and sandhi rather than a few verses repeated
+_SAMPLE_LINES = (
+    "धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः ।",
+    "मामकाः पाण्डवाश्चैव किमकुर्वत सञ्जय ॥",
+    "कर्मण्येवाधिकारस्ते मा फलेषु कदाचन ।",
+    "मा कर्मफलहेतुर्भूर्मा ते सङ्गोऽस्त्वकर्मणि ॥",
+    "योगस्थः कुरु कर्माणि सङ्गं त्यक्त्वा धनञ्जय ।",
+    "सिद्ध्यसिद्ध्योः समो भूत्वा समत्वं योग उच्यते ॥",
+    "वासांसि जीर्णानि यथा विहाय नवानि गृह्णाति नरोऽपराणि ।",
+    "तथा शरीराणि विहाय जीर्णान्यन्यानि संयाति नवानि देही ॥",
+    "नैनं छिन्दन्ति शस्त्राणि नैनं दहति पावकः ।",
+    "न चैनं क्लेदयन्त्यापो न शोषयति मारुतः ॥",
+    "ध्यायतो विषयान्पुंसः सङ्गस्तेषूपजायते ।",
+    "सङ्गात्सञ्जायते कामः कामात्क्रोधोऽभिजायते ॥",
+    "क्रोधाद्भवति सम्मोहः सम्मोहात्स्मृतिविभ्रमः ।",
+    "स्मृतिभ्रंशाद्बुद्धिनाशो बुद्धिनाशात्प्रणश्यति ॥",
+    "श्रेयान्स्वधर्मो विगुणः परधर्मात्स्वनुष्ठितात् ।",
+    "स्वधर्मे निधनं श्रेयः परधर्मो भयावहः ॥",
+    "यदा यदा हि धर्मस्य ग्लानिर्भवति भारत ।",
+    "अभ्युत्थानमधर्मस्य तदात्मानं सृजाम्यहम् ॥",
+    "परित्राणाय साधूनां विनाशाय च दुष्कृताम् ।",
+    "धर्मसंस्थापनार्थाय सम्भवामि युगे युगे ॥",
+    "उद्धरेदात्मनात्मानं नात्मानमवसादयेत् ।",
+    "आत्मैव ह्यात्मनो बन्धुरात्मैव रिपुरात्मनः ॥",
+    "अनन्याश्चिन्तयन्तो मां ये जनाः पर्युपासते ।",
+    "तेषां नित्याभियुक्तानां योगक्षेमं वहाम्यहम् ॥",
+    "पत्रं पुष्पं फलं तोयं यो मे भक्त्या प्रयच्छति ।",
+    "तदहं भक्त्युपहृतमश्नामि प्रयतात्मनः ॥",
+    "सर्वधर्मान्परित्यज्य मामेकं शरणं व्रज ।",
+    "अहं त्वा सर्वपापेभ्यो मोक्षयिष्यामि मा शुचः ॥",
+    "यत्र योगेश्वरः कृष्णो यत्र पार्थो धनुर्धरः ।",
+    "तत्र श्रीर्विजयो भूतिर्ध्रुवा नीतिर्मतिर्मम ॥",
+)
+
+_VOCABULARY = tuple(sorted({word for line in _SAMPLE_LINES for word in line.split() if word not in ("।", "॥")}))
+
+_DEVANAGARI_DIGITS = str.maketrans("0123456789", "०१२३४५६७८९")
+
+
+def synthesize_chapter(chapter: int) -> Dict[str, Any]:
+    """Chapter payload with the same keys as the real API."""
+    return {
+        "chapter_number": chapter,
+        "verses_count": CHAPTER_VERSES[chapter],
+        "name": f"अध्याय {chapter}",
+        "translation": f"Chapter {chapter}",
+        "transliteration": f"adhyaya {chapter}",
+        "meaning": {"en": f"Chapter {chapter}", "hi": f"अध्याय {chapter}"},
+        "summary": {
+            "en": f"Summary of chapter {chapter}. " * 20,
+            "hi": f"अध्याय {chapter} का सारांश। " * 20,
+        },
+    }
+
+
+def synthesize_verse(chapter: int, verse: int) -> Dict[str, Any]:
+    """
+    Verse payload with the same keys as the real API, including the ||c-v|| suffix.
+
+    Each verse is a deterministic, distinct draw of words from the sample
+    vocabulary, laid out as two lines of 4-5 words like a shloka.
+    """
+    rng = random.Random(chapter * 1000 + verse)
+    first, second = (" ".join(rng.choices(_VOCABULARY, k=rng.randint(4, 5))) for _ in range(2))
+    ref = f"{chapter}-{verse}".translate(_DEVANAGARI_DIGITS)
+    slok = f"{first} ।\n{second} ॥\n\n||{ref}||"
+    return {
+        "_id": f"BG{chapter}.{verse}",
+        "chapter": chapter,
+        "verse": verse,
+        "slok": slok,
+        "transliteration": "dharmakṣetre kurukṣetre samavetā yuyutsavaḥ",
+        "tej": {"author": "Swami Tejomayananda", "ht": "धृतराष्ट्र ने कहा ..."},
+        "rams": {"author": "Swami Ramsukhdas", "ht": "धृतराष्ट्र बोले ...", "hc": "..."},
+        "gambir": {"author": "Swami Gambirananda", "et": "Dhrtarastra said ..."},
+    }
+
+
+class FakeUpstream:
+    """
+    Fake Vedic Scriptures API served by uvicorn on a background thread.
+
+    Args:
+        latency_ms: Mean injected latency per request
+        jitter_ms: Uniform +/- jitter around the mean
+        error_rate: Fraction of requests answered with 503
+        seed: Seed for latency/error randomness, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 20.0,
+        jitter_ms: float = 5.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._recorded = self._load_fixtures()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.port = self._free_port()
+        self.app = self._build_app()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @staticmethod
+    def _load_fixtures() -> Dict[str, Any]:
+        recorded = {}
+        if FIXTURES_DIR.is_dir():
+            for path in FIXTURES_DIR.glob("*.json"):
+                # File names mirror endpoints: chapter_1.json, slok_2_47.json
+                recorded["/" + path.stem.replace("_", "/") + "/"] = json.loads(path.read_text(encoding="utf-8"))
+        return recorded
+
+    async def _respond(self, endpoint: str, fallback) -> Any:
+        self.requests += 1
+        delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise HTTPException(status_code=503, detail="Injected upstream error")
+        recorded = self._recorded.get(endpoint)
+        return recorded if recorded is not None else fallback()
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/chapter/{chapter}/")
+        async def chapter(chapter: int):
+            if chapter not in CHAPTER_VERSES:
+                raise HTTPException(status_code=404, detail="Not found")
+            return await self._respond(f"/chapter/{chapter}/", lambda: synthesize_chapter(chapter))
+
+        @app.get("/slok/{chapter}/{verse}/")
+        async def slok(chapter: int, verse: int):
+            if chapter not in CHAPTER_VERSES or not 1 <= verse <= CHAPTER_VERSES[chapter]:
+                raise HTTPException(status_code=404, detail="Not found")
+            return await self._respond(f"/slok/{chapter}/{verse}/", lambda: synthesize_verse(chapter, verse))
+
+        return app
+
+    def start(self) -> "FakeUpstream":
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-upstream", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake upstream failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeUpstream":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
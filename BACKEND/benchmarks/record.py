@@ -0,0 +1,49 @@
+"""
+Record real upstream responses into ``benchmarks/fixtures``.
+
+Needs network access. The fake upstream replays whatever is recorded and
+synthesizes the rest, so recording is optional.
+
+Usage (from the BACKEND directory):
+    python -m benchmarks.record                 # all chapters, verses of chapters 1-2
+    python -m benchmarks.record --chapters 1 2 18
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from .fake_upstream import CHAPTER_VERSES, FIXTURES_DIR
+
+UPSTREAM = "https://vedicscriptures.github.io"
+
+
+async def _record(client: httpx.AsyncClient, endpoint: str) -> None:
+    response = await client.get(f"{UPSTREAM}{endpoint}")
+    response.raise_for_status()
+    response.encoding = "utf-8"
+    name = endpoint.strip("/").replace("/", "_") + ".json"
+    (FIXTURES_DIR / name).write_text(json.dumps(response.json(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+async def main(chapters) -> None:
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    endpoints = [f"/chapter/{ch}/" for ch in CHAPTER_VERSES]
+    endpoints += [f"/slok/{ch}/{v}/" for ch in chapters for v in range(1, CHAPTER_VERSES[ch] + 1)]
+    semaphore = asyncio.Semaphore(10)
+
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        async def bounded(endpoint: str) -> None:
+            async with semaphore:
+                await _record(client, endpoint)
+
+        await asyncio.gather(*(bounded(endpoint) for endpoint in endpoints))
+    print(f"Recorded {len(endpoints)} responses into {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, nargs="+", default=[1, 2], help="Chapters whose verses to record")
+    asyncio.run(main(parser.parse_args().chapters))
@@ -0,0 +1,261 @@
+"""
+Run the offline benchmark suite and compare against a stored baseline.
+
+The app is driven in-process through ``httpx.ASGITransport`` against a local
+fake upstream (``fake_upstream.FakeUpstream``) and a fake TTS engine, so no
+network access is needed. Microbenchmarks report mean time per operation;
+load scenarios report p50/p95/p99 latency and throughput.
+
+Usage (from the BACKEND directory):
+    python -m benchmarks.run                      # run and compare to baseline
+    python -m benchmarks.run --update-baseline    # record a new baseline
+    python -m benchmarks.run --only micro --tolerance 0.5
+
+Baselines are machine-specific: record one on the machine that runs the
+comparison (e.g. the CI runner) before relying on regression checks.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .fake_upstream import CHAPTER_VERSES, FakeUpstream, synthesize_verse
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _micro(func: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Time ``func`` over a number of iterations, after a short warm-up."""
+    for _ in range(min(iterations // 10, 100)):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return {"mean_us": elapsed / iterations * 1e6, "iterations": iterations}
+
+
+def run_microbenchmarks() -> Dict[str, Dict[str, float]]:
+    from app.models.schemas import ChapterDetail, Verse
+    from app.services.phonetic_index import build_index, segment_word, split_words
+    from app.services.vedic_service import vedic_service
+
+    raw = synthesize_verse(2, 47)
+    verse = {
+        "chapter": 2,
+        "verse": 47,
+        "slok": vedic_service._clean_slok_text(raw["slok"]),
+        "transliteration": raw["transliteration"],
+        "hindi_translation": raw["rams"]["ht"],
+        "english_translation": raw["gambir"]["et"],
+    }
+    chapter = {
+        "chapter_number": 18,
+        "name": "अध्याय 18",
+        "translation": "Chapter 18",
+        "verses_count": 78,
+        "summary": {"en": "...", "hi": "..."},
+        "verses": [dict(verse, verse=v) for v in range(1, 79)],
+    }
+    corpus = [
+        (ch, v, vedic_service._clean_slok_text(synthesize_verse(ch, v)["slok"]))
+        for ch, count in CHAPTER_VERSES.items()
+        for v in range(1, count + 1)
+    ]
+    index = build_index(corpus)
+    words = split_words(verse["slok"])
+
+    return {
+        "normalize_slok": _micro(lambda: vedic_service._clean_slok_text(raw["slok"]), 20000),
+        "validate_verse": _micro(lambda: Verse(**verse), 20000),
+        "serialize_verse": _micro(lambda: Verse(**verse).model_dump_json(), 10000),
+        "serialize_chapter_78": _micro(lambda: ChapterDetail(**chapter).model_dump_json(), 500),
+        "segment_verse": _micro(lambda: [segment_word(word) for word in words], 10000),
+        "build_index_700": _micro(lambda: build_index(corpus), 5),
+        "index_lookup_cluster": _micro(lambda: index.verses_containing("क्ष"), 50000),
+        "index_verse_words": _micro(lambda: index.verse_words(2, 47), 20000),
+    }
+
+
+async def _load(client, requests: List[Callable], concurrency: int) -> Dict[str, float]:
+    """Issue requests with bounded concurrency; return latency percentiles and throughput."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(make_request: Callable) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(client)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(make_request) for make_request in requests))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "throughput_rps": len(requests) / wall if wall else 0.0,
+    }
+
+
+async def run_load_scenarios() -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from app.main import app
+
+    from .fake_tts import patched_tts
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+        with patched_tts():
+            return {
+                # Many clients open the app at once and all ask for today's verse
+                "verse_of_the_day_stampede": await _load(
+                    client, [lambda c: c.get("/api/v1/verse-of-the-day")] * 200, concurrency=200
+                ),
+                # Largest chapter with every verse: 1 + 78 upstream calls per request
+                "chapter_fanout": await _load(
+                    client, [lambda c: c.get("/api/v1/chapter/18?include_verses=true")] * 10, concurrency=5
+                ),
+                # Mixed single-verse reads across the corpus
+                "verse_reads": await _load(
+                    client,
+                    [
+                        (lambda ch, v: lambda c: c.get(f"/api/v1/slok/{ch}/{v}"))(ch, v)
+                        for ch in CHAPTER_VERSES
+                        for v in range(1, 11)
+                    ],
+                    concurrency=50,
+                ),
+                # Burst of recitation audio requests larger than the worker pool
+                "tts_burst": await _load(
+                    client,
+                    [lambda c: c.post("/api/v1/tts/generate", json={"text": "कर्मण्येवाधिकारस्ते मा फलेषु कदाचन"})] * 40,
+                    concurrency=40,
+                ),
+            }
+
+
+# Metrics checked for regressions: (section, metric, higher_is_better)
+CHECKED_METRICS = (
+    ("micro", "mean_us", False),
+    ("load", "p95_ms", False),
+    ("load", "p99_ms", False),
+    ("load", "throughput_rps", True),
+)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return human-readable regressions beyond ``tolerance`` (a fraction, e.g. 0.25)."""
+    regressions = []
+    for section, metric, higher_is_better in CHECKED_METRICS:
+        for name, values in results.get(section, {}).items():
+            base = baseline.get(section, {}).get(name, {}).get(metric)
+            current = values.get(metric)
+            if not base or current is None:
+                continue
+            change = (current - base) / base
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{section}/{name} {metric}: {base:.2f} -> {current:.2f} ({change:+.0%})")
+    for name, values in results.get("load", {}).items():
+        if values.get("errors"):
+            regressions.append(f"load/{name}: {values['errors']} of {values['requests']} requests failed")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict]) -> None:
+    if "micro" in results:
+        print(f"\n{'microbenchmark':<28}{'mean':>14}")
+        for name, values in results["micro"].items():
+            print(f"{name:<28}{values['mean_us']:>11.2f} us")
+    if "load" in results:
+        print(f"\n{'scenario':<28}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'errors':>8}")
+        for name, v in results["load"].items():
+            print(
+                f"{name:<28}{v['p50_ms']:>8.1f}ms{v['p95_ms']:>8.1f}ms{v['p99_ms']:>8.1f}ms"
+                f"{v['throughput_rps']:>10.1f}{v['errors']:>8}"
+            )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=("micro", "load"), help="Run only one section")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (fraction)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Fake upstream latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream calls that fail with 503")
+    parser.add_argument("--output", type=Path, help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    upstream = FakeUpstream(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    # Settings are read at import time, so point the app at the fake upstream first
+    os.environ["VEDIC_API_BASE_URL"] = upstream.base_url
+    # Start every run with cold caches so results don't depend on earlier runs
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="recitation-bench-")
+    os.environ.setdefault("SLOW_REQUEST_THRESHOLD_MS", "600000")
+
+    results: Dict[str, Any] = {}
+    with upstream:
+        if args.only in (None, "micro"):
+            results["micro"] = run_microbenchmarks()
+        if args.only in (None, "load"):
+            results["load"] = asyncio.run(run_load_scenarios())
+    results["upstream_requests"] = upstream.requests
+
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        # Fail rather than pass silently, so a CI gate without a baseline is noticed
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 2
+
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    if args.error_rate:
+        # Injected upstream errors are expected to surface as failed requests
+        regressions = [r for r in regressions if "requests failed" not in r]
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Tests for the memory-mapped corpus file and the corpus build."""
+
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import cache
+from app.services.cache import CORPUS_MAGIC, CorpusStore, build_corpus_file
+from app.services.vedic_service import vedic_service
+
+
+def _store(path):
+    store = CorpusStore(path)
+    store.reopen_interval = 0
+    return store
+
+
+def test_write_and_read_round_trip(tmp_path):
+    path = tmp_path / "corpus.bin"
+    records = {
+        "/chapter/1/": {"verses_count": 47, "name": "अर्जुनविषादयोग"},
+        "/slok/1/1/": {"slok": "धर्मक्षेत्रे कुरुक्षेत्रे", "verse": 1},
+    }
+    CorpusStore.write(path, records)
+
+    with path.open("rb") as fh:
+        assert fh.read(len(CORPUS_MAGIC)) == CORPUS_MAGIC
+    store = _store(path)
+    assert store.get("/slok/1/1/") == records["/slok/1/1/"]
+    assert store.get("/slok/9/9/") is None
+    assert store.is_loaded and len(store) == 2
+    assert CorpusStore.read_all(path) == records
+    store.close()
+
+
+def test_replaced_file_is_remapped(tmp_path):
+    path = tmp_path / "corpus.bin"
+    CorpusStore.write(path, {"/slok/1/1/": {"v": 1}})
+    store = _store(path)
+    assert store.get("/slok/1/1/") == {"v": 1}
+
+    # os.replace gives the new file a different inode
+    CorpusStore.write(path, {"/slok/1/1/": {"v": 2}, "/slok/1/2/": {"v": 3}})
+    assert store.get("/slok/1/1/") == {"v": 2}
+    assert store.get("/slok/1/2/") == {"v": 3}
+
+    # A deleted file keeps the current mapping
+    path.unlink()
+    assert store.get("/slok/1/2/") == {"v": 3}
+    store.close()
+
+
+def test_missing_file_is_picked_up_once_written(tmp_path):
+    path = tmp_path / "corpus.bin"
+    store = _store(path)
+    assert store.get("/slok/1/1/") is None and not store.is_loaded
+    CorpusStore.write(path, {"/slok/1/1/": {"v": 1}})
+    assert store.get("/slok/1/1/") == {"v": 1}
+    store.close()
+
+
+@pytest.mark.parametrize("content", [b"", b"RC", b"NOTCORP1" + b"\0" * 8 + b"{}"])
+def test_empty_or_unknown_file_is_ignored(tmp_path, content):
+    path = tmp_path / "corpus.bin"
+    path.write_bytes(content)
+    store = _store(path)
+    assert store.get("/slok/1/1/") is None
+    assert not store.is_loaded
+    assert CorpusStore.read_all(path) == {}
+
+
+def test_build_keeps_previous_records_for_failed_fetches(tmp_path, monkeypatch):
+    path = tmp_path / "corpus.bin"
+    CorpusStore.write(path, {"/slok/2/1/": {"old": True}, "/slok/2/2/": {"old": True}})
+
+    async def fake_fetch(endpoint, client=None):
+        if endpoint == "/chapter/2/":
+            raise HTTPException(status_code=503, detail="down")
+        if endpoint.startswith("/chapter/"):
+            return {"verses_count": 1 if endpoint == "/chapter/1/" else 0}
+        if endpoint == "/slok/1/1/":
+            return {"new": True}
+        raise AssertionError(f"unexpected fetch {endpoint}")
+
+    monkeypatch.setattr(vedic_service, "_fetch_upstream", fake_fetch)
+    count = asyncio.run(build_corpus_file(path))
+
+    records = CorpusStore.read_all(path)
+    assert records["/slok/1/1/"] == {"new": True}
+    assert records["/slok/2/1/"] == records["/slok/2/2/"] == {"old": True}
+    assert "/chapter/2/" not in records
+    assert count == len(records)
+
+
+def test_build_without_any_records_raises_and_leaves_file(tmp_path, monkeypatch):
+    path = tmp_path / "corpus.bin"
+
+    async def failing_fetch(endpoint, client=None):
+        raise HTTPException(status_code=503, detail="down")
+
+    monkeypatch.setattr(vedic_service, "_fetch_upstream", failing_fetch)
+    with pytest.raises(RuntimeError):
+        asyncio.run(build_corpus_file(path))
+    assert not path.exists()
+
+
+def test_prepare_shared_cache_survives_failed_build(tmp_path, monkeypatch):
+    path = tmp_path / "corpus.bin"
+    CorpusStore.write(path, {"/slok/1/1/": {"v": 1}})
+    old = path.stat().st_mtime - 10 * 86400
+    os.utime(path, (old, old))
+
+    async def failing_build(*args, **kwargs):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(cache, "CORPUS_PATH", path)
+    monkeypatch.setattr(cache, "build_corpus_file", failing_build)
+    cache.prepare_shared_cache(max_age=0)
+    assert CorpusStore.read_all(path) == {"/slok/1/1/": {"v": 1}}
@@ -0,0 +1,126 @@
+"""Tests for Devanagari akshara segmentation and the phonetic index."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import phonetic_index as module
+from app.services import vedic_service
+from app.services.cache import CorpusStore
+from app.services.phonetic_index import (
+    ANUSVARA_FLAG,
+    ASPIRATE,
+    CONJUNCT,
+    HALANT,
+    RETROFLEX,
+    PhoneticIndexService,
+    SIBILANT,
+    VISARGA_FLAG,
+    akshara_features,
+    build_index,
+    segment_word,
+    split_words,
+)
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("धर्मक्षेत्रे", ["ध", "र्म", "क्षे", "त्रे"]),
+    ("युयुत्सवः", ["यु", "यु", "त्स", "वः"]),
+    ("अहं", ["अ", "हं"]),
+    ("तत्", ["त", "त्"]),
+    ("सङ्गोऽस्त्वकर्मणि", ["स", "ङ्गो", "ऽ", "स्त्व", "क", "र्म", "णि"]),
+    ("लक्ष्मी", ["ल", "क्ष्मी"]),
+    ("ॐ", ["ॐ"]),
+])
+def test_segment_word(word, expected):
+    assert segment_word(word) == expected
+    assert "".join(segment_word(word)) == word
+
+
+def test_split_words_drops_dandas_and_verse_numbers():
+    assert split_words("मा फलेषु कदाचन ।\nमा कर्मणि ॥२-४७॥") == ["मा", "फलेषु", "कदाचन", "मा", "कर्मणि"]
+
+
+@pytest.mark.parametrize("akshara, expected", [
+    ("क", 0),
+    ("ध", ASPIRATE),
+    ("ण", RETROFLEX),
+    ("स", SIBILANT),
+    ("वः", VISARGA_FLAG),
+    ("हं", ANUSVARA_FLAG),
+    ("त्", HALANT),
+    ("त्रे", CONJUNCT),
+    ("क्षे", CONJUNCT | RETROFLEX | SIBILANT),
+    ("ष्ठ", CONJUNCT | RETROFLEX | SIBILANT | ASPIRATE),
+])
+def test_akshara_features(akshara, expected):
+    assert akshara_features(akshara) == expected
+
+
+@pytest.fixture
+def index():
+    return build_index([
+        (1, 1, "धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः ।"),
+        (2, 47, "कर्मण्येवाधिकारस्ते मा फलेषु कदाचन ।"),
+        (10, 41, "यद्यद्विभूतिमत्सत्त्वं श्रीमदूर्जितमेव वा ।"),
+        (18, 78, "तत्र श्रीर्विजयो भूतिर्ध्रुवा लक्ष्मीः ॥"),
+    ])
+
+
+def test_cluster_query_matches_any_akshara_built_on_it(index):
+    assert index.verses_containing("क्ष") == [(1, 1), (18, 78)]
+    assert index.verses_containing("क्ष्म") == [(18, 78)]
+
+
+def test_cluster_query_matches_sub_clusters(index):
+    # ष stands alone in फलेषु and inside the क्ष and क्ष्म conjuncts
+    assert index.verses_containing("ष") == [(1, 1), (2, 47), (18, 78)]
+    assert index.verses_containing(" त्र ") == [(1, 1), (18, 78)]
+    assert index.verses_containing("र्ज") == [(10, 41)]
+
+
+def test_full_akshara_query_matches_exactly(index):
+    assert index.verses_containing("क्षे") == [(1, 1)]
+    assert index.verses_containing("त्रे") == [(1, 1)]
+    assert index.verses_containing("क्ष्मीः") == [(18, 78)]
+
+
+def test_unknown_query_matches_nothing(index):
+    assert index.verses_containing("ङ्क्ष") == []
+    assert index.verses_containing("ळ") == []
+
+
+def test_verse_words_and_difficulty(index):
+    words = index.verse_words(1, 1)
+    assert [word["text"] for word in words] == ["धर्मक्षेत्रे", "कुरुक्षेत्रे", "समवेता", "युयुत्सवः"]
+    assert words[0]["aksharas"] == ["ध", "र्म", "क्षे", "त्रे"]
+    assert "conjunct" in words[0]["features"]
+    assert index.verse_difficulty(1, 1) == sum(word["difficulty"] for word in words)
+    assert index.verse_words(3, 1) is None
+    assert index.most_difficult_verses(1, chapter=2)[0][:2] == (2, 47)
+
+
+def test_index_build_bounds_upstream_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setattr(vedic_service, "corpus_store", CorpusStore(tmp_path / "missing.bin"))
+    monkeypatch.setattr(settings, "warmup_concurrency", 4)
+    service = vedic_service.VedicScripturesService()
+    monkeypatch.setattr(module, "vedic_service", service)
+    in_flight = peak = 0
+
+    async def fetch(endpoint, client=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        if endpoint.startswith("/chapter/"):
+            return {"verses_count": 10}
+        return {"slok": "धर्मक्षेत्रे कुरुक्षेत्रे"}
+
+    monkeypatch.setattr(service, "_fetch_upstream", fetch)
+    index_service = PhoneticIndexService()
+    index = asyncio.run(index_service.get_index())
+
+    assert len(index) == 180 and index_service.is_ready
+    assert peak == 4
@@ -0,0 +1,229 @@
+"""Tests for the circuit breaker, adaptive timeouts and hedged upstream GETs."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.resilience import HEDGE_BURST, CircuitBreaker, LatencyTracker, UpstreamResilience
+
+
+class FakeClient:
+    """Stand-in for ``httpx.AsyncClient`` with a small connection pool."""
+
+    def __init__(self, latency: float = 0.02, connections: int = 100, statuses=None):
+        self.latency = latency
+        self.calls = 0
+        self._pool = asyncio.Semaphore(connections)
+        self._statuses = list(statuses or [])
+
+    async def get(self, url, timeout=None):
+        self.calls += 1
+        status = self._statuses.pop(0) if self._statuses else 200
+        async with self._pool:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(status, request=httpx.Request("GET", url))
+
+
+def _breaker(threshold: int = 2) -> CircuitBreaker:
+    return CircuitBreaker("h", failure_threshold=threshold, reset_timeout=30.0)
+
+
+def _expire(breaker: CircuitBreaker) -> None:
+    """Pretend the open breaker's reset timeout has passed."""
+    breaker._opened_at -= breaker.reset_timeout
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(breaker.allow())
+    assert breaker.state == "open"
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = _breaker(threshold=3)
+    breaker.record_failure(breaker.allow())
+    breaker.record_failure(breaker.allow())
+    breaker.record_success(breaker.allow())
+    breaker.record_failure(breaker.allow())
+    breaker.record_failure(breaker.allow())
+    assert breaker.state == "closed"
+    breaker.record_failure(breaker.allow())
+    assert breaker.state == "open"
+    assert breaker.allow() is None
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = _breaker()
+    _trip(breaker)
+    _expire(breaker)
+    probe = breaker.allow()
+    assert probe is not None and breaker.state == "half_open"
+    assert breaker.allow() is None
+    breaker.record_success(probe)
+    assert breaker.state == "closed"
+    assert breaker.allow() is not None
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = _breaker()
+    _trip(breaker)
+    _expire(breaker)
+    breaker.record_failure(breaker.allow())
+    assert breaker.state == "open"
+    assert breaker.allow() is None
+
+
+def test_cancelled_probe_releases_ownership():
+    breaker = _breaker()
+    _trip(breaker)
+    _expire(breaker)
+    probe = breaker.allow()
+    breaker.release(probe)
+    assert breaker.state == "half_open"
+    assert breaker.allow() is not None
+
+
+def test_late_release_does_not_free_someone_elses_probe():
+    breaker = _breaker()
+    late = breaker.allow()  # started while closed
+    _trip(breaker)
+    _expire(breaker)
+    probe = breaker.allow()
+    breaker.release(late)
+    assert breaker.allow() is None
+    breaker.release(probe)
+    assert breaker.allow() is not None
+
+
+@pytest.mark.parametrize("half_open", [False, True])
+def test_late_success_closes_breaker(half_open):
+    breaker = _breaker()
+    late = breaker.allow()
+    _trip(breaker)
+    if half_open:
+        _expire(breaker)
+        breaker.allow()
+    breaker.record_success(late)
+    assert breaker.state == "closed"
+    assert breaker.allow() is not None
+
+
+def test_late_failure_reopens_half_open_breaker():
+    breaker = _breaker()
+    late = breaker.allow()
+    _trip(breaker)
+    _expire(breaker)
+    probe = breaker.allow()
+    breaker.record_failure(late)
+    assert breaker.state == "open"
+    # The probe is still owned by its call until it reports back
+    _expire(breaker)
+    assert breaker.allow() is None
+    breaker.record_failure(probe)
+    _expire(breaker)
+    assert breaker.allow() is not None
+
+
+def test_latency_tracker_defaults_until_enough_samples(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_timeout", 30.0)
+    monkeypatch.setattr(settings, "upstream_hedge_default_delay", 1.0)
+    tracker = LatencyTracker(min_samples=20)
+    for _ in range(19):
+        tracker.observe(0.1)
+    assert tracker.percentile(99) is None
+    assert tracker.timeout() == 30.0
+    assert tracker.hedge_delay() == 1.0
+
+
+@pytest.mark.parametrize("latency, expected", [
+    (0.01, 2.0),   # 0.04s, raised to upstream_timeout_min
+    (1.0, 4.0),    # p99 * multiplier
+    (20.0, 30.0),  # 80s, capped at upstream_timeout
+])
+def test_latency_tracker_timeout_is_clamped(monkeypatch, latency, expected):
+    monkeypatch.setattr(settings, "upstream_timeout", 30.0)
+    monkeypatch.setattr(settings, "upstream_timeout_min", 2.0)
+    monkeypatch.setattr(settings, "upstream_timeout_multiplier", 4.0)
+    tracker = LatencyTracker(min_samples=20)
+    for _ in range(20):
+        tracker.observe(latency)
+    assert tracker.timeout() == pytest.approx(expected)
+
+
+def test_hedge_delay_follows_p95_with_a_floor(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_hedge_min_delay", 0.05)
+    tracker = LatencyTracker(min_samples=20)
+    for i in range(1, 101):
+        tracker.observe(i / 100)
+    assert tracker.hedge_delay() == pytest.approx(0.95)
+    fast = LatencyTracker(min_samples=1)
+    fast.observe(0.001)
+    assert fast.hedge_delay() == 0.05
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_hedging_enabled", True)
+    monkeypatch.setattr(settings, "upstream_hedge_default_delay", 0.005)
+    monkeypatch.setattr(settings, "upstream_hedge_budget", 0.05)
+    monkeypatch.setattr(settings, "upstream_hedge_max_in_flight", 16)
+
+
+def test_fan_out_is_not_hedged(hedging):
+    """Queueing for pooled connections in a fan-out must not trigger hedges."""
+    resilience = UpstreamResilience()
+    resilience._hedge_tokens["h"] = HEDGE_BURST
+
+    async def run():
+        client = FakeClient(latency=0.02, connections=4)
+        await asyncio.gather(*(resilience.get(client, "http://h/slok/1/1/", "h") for _ in range(200)))
+        return client
+
+    client = asyncio.run(run())
+    assert resilience._hedges.get("h", 0) <= HEDGE_BURST
+    assert client.calls <= 200 + HEDGE_BURST
+
+
+def test_hedges_stay_within_budget(hedging):
+    resilience = UpstreamResilience()
+
+    async def run():
+        client = FakeClient(latency=0.02)
+        for _ in range(100):
+            await resilience.get(client, "http://h/", "h")
+
+    asyncio.run(run())
+    # 100 requests at a 5% budget earn 5 hedges
+    assert 1 <= resilience._hedges["h"] <= 5
+
+
+def _hedged_get(statuses, latency=0.02):
+    resilience = UpstreamResilience()
+    resilience._hedge_tokens["h"] = HEDGE_BURST
+
+    async def run():
+        return await resilience.get(FakeClient(latency=latency, statuses=statuses), "http://h/", "h")
+
+    return resilience, asyncio.run(run())
+
+
+def test_hedge_that_fails_is_not_a_win(hedging):
+    resilience, response = _hedged_get([503, 503])
+    assert response.status_code == 503
+    assert resilience._hedges["h"] == 1
+    assert resilience._hedge_wins.get("h", 0) == 0
+
+
+def test_good_hedge_after_failed_primary_is_a_win(hedging):
+    resilience, response = _hedged_get([503, 200])
+    assert response.status_code == 200
+    assert resilience._hedge_wins["h"] == 1
+
+
+def test_primary_answering_first_is_not_a_win(hedging):
+    resilience, response = _hedged_get([200, 200])
+    assert response.status_code == 200
+    assert resilience._hedges["h"] == 1
+    assert resilience._hedge_wins.get("h", 0) == 0
@@ -0,0 +1,74 @@
+"""Tests for upstream request coalescing and stale-cache fallback."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import vedic_service as module
+from app.services.cache import CorpusStore, MemoryCache
+from app.services.vedic_service import VedicScripturesService
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(module, "corpus_store", CorpusStore(tmp_path / "missing.bin"))
+    return VedicScripturesService()
+
+
+def _fake_upstream(service, monkeypatch, result=None, status_code=None):
+    calls = []
+
+    async def fetch(endpoint, client=None):
+        calls.append(endpoint)
+        await asyncio.sleep(0.01)
+        if status_code is not None:
+            raise HTTPException(status_code=status_code, detail="upstream failed")
+        return result
+
+    monkeypatch.setattr(service, "_fetch_upstream", fetch)
+    return calls
+
+
+async def _concurrently(service, endpoint, n=5):
+    return await asyncio.gather(*(service._fetch_json(endpoint) for _ in range(n)), return_exceptions=True)
+
+
+def test_concurrent_requests_share_one_fetch_and_cache_it(service, monkeypatch):
+    calls = _fake_upstream(service, monkeypatch, result={"slok": "x"})
+
+    async def run():
+        results = await _concurrently(service, "/slok/1/1")
+        cached = await service._fetch_json("/slok/1/1")
+        return results, cached
+
+    results, cached = asyncio.run(run())
+    assert results == [{"slok": "x"}] * 5
+    assert cached == {"slok": "x"}
+    assert calls == ["/slok/1/1/"]
+
+
+def test_stale_entry_is_served_to_every_waiter_when_upstream_fails(service, monkeypatch):
+    # A negative TTL makes every entry expired as soon as it is stored
+    service._memory_cache = MemoryCache(max_entries=10, ttl=-1)
+    service._memory_cache.set("/slok/1/1/", {"slok": "x"})
+    calls = _fake_upstream(service, monkeypatch, status_code=503)
+
+    results = asyncio.run(_concurrently(service, "/slok/1/1"))
+    assert results == [{"slok": "x"}] * 5
+    assert calls == ["/slok/1/1/"]
+
+
+def test_errors_without_stale_entry_reach_every_waiter(service, monkeypatch):
+    _fake_upstream(service, monkeypatch, status_code=503)
+    results = asyncio.run(_concurrently(service, "/slok/1/1"))
+    assert all(isinstance(result, HTTPException) and result.status_code == 503 for result in results)
+
+
+def test_client_errors_do_not_fall_back_to_stale_data(service, monkeypatch):
+    service._memory_cache = MemoryCache(max_entries=10, ttl=-1)
+    service._memory_cache.set("/slok/1/99/", {"slok": "x"})
+    _fake_upstream(service, monkeypatch, status_code=404)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(service._fetch_json("/slok/1/99"))
+    assert excinfo.value.status_code == 404